@@ -1,9 +1,14 @@
 # src/app.py
+# Primero: el reporte de arranque mide desde aquí
+from modules.shared.utils.arranque import ESTADO, cargar_modulo, modulo_cargado
+
+import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles  
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -17,8 +22,9 @@ from modules.shared.middlewares.error_middleware import (
 from modules.shared.middlewares.logging_middleware import log_requests_middleware
 
 
-# Modules
+# Modules (el router importa sus controladores recién al usarlos)
 from modules.search.index import search_module
+from settings import Settings
 
 # Configuración del logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
@@ -35,7 +41,8 @@ PRODUCTION_DOMAINS = [
     "project-myra-frontend.vercel.app"
 ]
 
-LOCAL_DOMAINS = ["localhost", "0.0.0.0"]
+# healthcheck.railway.app: host con el que Railway consulta /ready
+LOCAL_DOMAINS = ["localhost", "0.0.0.0", "healthcheck.railway.app"]
 
 ALLOWED_DOMAINS = [*LOCAL_DOMAINS, *PRODUCTION_DOMAINS]
 
@@ -50,11 +57,99 @@ CORS_ORIGINS = [
     *[f"https://{domain}" for domain in PRODUCTION_DOMAINS],
 ]
 
+# Módulos pesados que se importan en segundo plano después de aceptar conexiones,
+# en este orden para que el reporte de arranque muestre el costo de cada uno
+MODULOS_PRECARGA = [
+    "numpy",
+    "pandas",
+    "openpyxl",
+    "playwright.async_api",
+    "modules.search.utils.consulta_unificada",
+    "modules.search.utils.validacion_personas",
+    "modules.search.utils.precalentamiento",
+    "modules.search.controllers.private_controller",
+]
+CONSULTA_UNIFICADA = "modules.search.utils.consulta_unificada"
+PRECALENTAMIENTO = "modules.search.utils.precalentamiento"
+
+
+async def iniciar_navegadores(consulta_unificada):
+    """
+    Abre los navegadores de SUNAT y REINFO reintentando con espera creciente: una falla
+    pasajera de Chromium no debe dejar la instancia sin quedar lista para siempre.
+    """
+    espera = 2.0
+    while True:
+        try:
+            await asyncio.gather(
+                consulta_unificada.obtener_scraper_sunat(),
+                consulta_unificada.obtener_scraper_reinfo(),
+            )
+            ESTADO.error = None
+            ESTADO.fallido = False
+            return
+        except Exception as e:
+            ESTADO.fallas_navegadores += 1
+            ESTADO.error = str(e) or type(e).__name__
+            if ESTADO.fallas_navegadores >= Settings.ARRANQUE_MAX_FALLAS_NAVEGADORES:
+                ESTADO.fallido = True
+            logging.warning(
+                f"⚠️ No se pudieron abrir los navegadores (falla {ESTADO.fallas_navegadores}): "
+                f"{ESTADO.error}. Reintentando en {espera:.0f}s"
+            )
+            await asyncio.sleep(espera)
+            espera = min(espera * 2, Settings.ARRANQUE_ESPERA_MAXIMA_SEGUNDOS)
+
+
+async def precargar():
+    """
+    Importa los módulos pesados y abre los navegadores sin demorar el arranque del servidor.
+    """
+    try:
+        for nombre in MODULOS_PRECARGA:
+            await cargar_modulo(nombre)
+    except Exception as e:
+        # Un módulo que no se puede importar no se arregla reintentando: /health lo informa
+        ESTADO.error = str(e) or type(e).__name__
+        ESTADO.fallido = True
+        logging.error(f"❌ Error en la precarga del arranque: {ESTADO.error}")
+        return
+    ESTADO.marcar("modulos_listos")
+
+    consulta_unificada = await cargar_modulo(CONSULTA_UNIFICADA)
+    if Settings.ARRANQUE_INICIAR_NAVEGADORES:
+        await iniciar_navegadores(consulta_unificada)
+    ESTADO.marcar("scrapers_listos")
+
+    (await cargar_modulo(PRECALENTAMIENTO)).iniciar_precalentamiento()
+    logging.info(f"🚀 Arranque completo: {ESTADO.to_dict()}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ESTADO.marcar("aceptando_conexiones")
+    tarea_precarga = asyncio.create_task(precargar())
+    yield
+
+    tarea_precarga.cancel()
+    try:
+        await tarea_precarga
+    except asyncio.CancelledError:
+        pass
+    # Cerrar el precalentamiento y los navegadores compartidos, solo si llegaron a cargarse
+    if modulo_cargado(PRECALENTAMIENTO):
+        await (await cargar_modulo(PRECALENTAMIENTO)).detener_precalentamiento()
+    if modulo_cargado(CONSULTA_UNIFICADA):
+        await (await cargar_modulo(CONSULTA_UNIFICADA)).cerrar_scrapers()
+
+
 app = FastAPI(
     title="Python Backend Test",
     description="Backend API",
     version="1.0.0",
+    lifespan=lifespan,
 )
+ESTADO.marcar("app_importada")
 
 # --- Montar archivos estáticos desde /public ---
 current_file_path = os.path.abspath(__file__)
@@ -90,6 +185,30 @@ async def root():
     return {"message": "Hello World!"}
 
 
+# Liveness: el proceso acepta conexiones y puede llegar a estar listo.
+# 503 si la precarga falló sin remedio, para que la plataforma reinicie la instancia.
+@app.get("/health", tags=["Health"])
+async def health():
+    if ESTADO.fallido:
+        return JSONResponse(status_code=503, content={"status": "error", "error": ESTADO.error})
+    return {"status": "ok"}
+
+
+# Readiness: módulos cargados y navegadores abiertos (503 mientras tanto)
+@app.get("/ready", tags=["Health"])
+async def ready():
+    listo = ESTADO.alcanzo("scrapers_listos")
+    return JSONResponse(
+        status_code=200 if listo else 503,
+        content={
+            "ready": listo,
+            "modulesReady": ESTADO.alcanzo("modulos_listos"),
+            "scrapersReady": listo,
+            "startup": ESTADO.to_dict(),
+        },
+    )
+
+
 # Endpoint para favicon.ico (compatibilidad con navegadores)
 @app.get("/favicon.ico", tags=["Favicon"])
 async def favicon():
@@ -1,33 +1,280 @@
-from fastapi.responses import JSONResponse
 from fastapi import Request, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from modules.search.utils.validacion_personas import validacion_total
+from modules.search.utils.consulta_unificada import consultar_ruc, consultar_rucs
+from modules.search.utils.normalizacion_ruc import normalizar_ruc, ruc_es_valido
+from modules.search.utils.lectura_archivo import ArchivoInvalidoError, EXTENSIONES_PERMITIDAS
+from modules.search.utils.exportacion import FORMATOS_EXPORTACION, formatos_disponibles
+from modules.search.utils.resultados import (
+    NOMBRE_ALERTAS,
+    TrabajoExistenteError,
+    carpeta_trabajo,
+    formatos_en_progreso,
+    job_id_valido,
+    nuevo_job_id,
+    ruta_resultado,
+    seguir_archivo,
+    trabajo_en_progreso,
+)
+from modules.search.utils.validacion_personas import NOMBRE_SALIDA
+from modules.search.utils.planificador import PRIORIDADES, en_trabajo
+from modules.shared.utils.compact_response import compact_json_response
+from modules.shared.utils.profiler import SamplingProfiler
+from modules.shared.utils.tracing import finish_trace, get_current_trace_id, get_trace, start_trace
+from settings import Settings
+import os
 import tempfile
 
+def es_verdadero(valor) -> bool:
+    return str(valor or "").strip().lower() in ("1", "true", "si", "sí")
+
+
 async def process_excel(request: Request, response: Response):
+    form = await request.form()
+
+    # El cliente puede fijar el job_id para empezar a descargar mientras se genera.
+    # La traza usa el mismo id: /jobs/{job_id}/trace, /profile, /result y /alerts
+    job_id = str(form.get("job_id") or "").lower() or nuevo_job_id()
+    if not job_id_valido(job_id):
+        raise HTTPException(status_code=400, detail="job_id debe ser un UUID hex de 32 caracteres")
+
+    traza = start_trace("process-excel", trace_id=job_id)
+    perfilador = None
+    if Settings.PERFILADO_HABILITADO and es_verdadero(request.headers.get("x-profile")):
+        perfilador = SamplingProfiler().start()
+
+    guardar_traza = True
+    try:
+        respuesta = await _process_excel(request, form, job_id)
+        respuesta.headers["X-Trace-Id"] = traza.trace_id
+        return respuesta
+    except HTTPException as e:
+        # El job_id ya es de otro trabajo: su traza no se reemplaza con la de este rechazo
+        guardar_traza = e.status_code != 409
+        # Los trabajos que fallan son los que más interesa diagnosticar: también llevan su traza
+        e.headers = {**(e.headers or {}), "X-Trace-Id": traza.trace_id}
+        raise
+    finally:
+        if perfilador:
+            traza.profile = perfilador.stop()
+        finish_trace(traza, store=guardar_traza)
+
+
+async def _process_excel(request: Request, form, job_id: str):
     try:
-        form = await request.form()
         file = form.get("file")
 
         if file is None:
             raise HTTPException(status_code=400, detail="No se envió ningún archivo")
 
-        if not file.filename.endswith(('.xlsx', '.xls')):
-            raise HTTPException(status_code=400, detail="El archivo debe ser un Excel (.xlsx o .xls)")
+        if not file.filename.lower().endswith(EXTENSIONES_PERMITIDAS):
+            raise HTTPException(status_code=400, detail="El archivo debe ser un Excel (.xlsx o .xls) o un CSV (.csv)")
+
+        cliente = form.get("cliente") or None
+
+        incremental = es_verdadero(form.get("incremental"))
+        bajo_consumo = es_verdadero(form.get("bajo_consumo"))
+
+        prioridad = PRIORIDADES.get(str(form.get("prioridad") or "normal").lower())
+        if prioridad is None or prioridad > PRIORIDADES["normal"]:
+            # "alta" queda para las consultas interactivas por RUC
+            raise HTTPException(status_code=400, detail="prioridad debe ser 'normal' o 'baja'")
+
+        if incremental and not cliente:
+            raise HTTPException(status_code=400, detail="El modo incremental requiere el campo 'cliente'")
 
+        # Formatos de exportación adicionales al xlsx, p. ej. "csv,parquet"
+        formatos = [f.strip().lower() for f in str(form.get("formatos") or "").split(",") if f.strip()]
+        no_soportados = set(formatos) - formatos_disponibles(incremental=bajo_consumo)
+        if no_soportados:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Formatos no disponibles: {', '.join(sorted(no_soportados))}",
+            )
+
+        # El archivo se escribe recién con el formulario validado; se borra pase lo que pase
         contents = await file.read()
 
         with tempfile.NamedTemporaryFile(delete=False, suffix=file.filename) as tmp:
             tmp.write(contents)
             tmp_path = tmp.name
 
-        resultado, _ = await validacion_total(excel_path=tmp_path)
+        try:
+            resultado, _ = await validacion_total(
+                excel_path=tmp_path,
+                cliente=cliente,
+                incremental=incremental,
+                formatos=formatos,
+                bajo_consumo=bajo_consumo,
+                job_id=job_id,
+                prioridad=prioridad,
+            )
+        finally:
+            os.remove(tmp_path)
 
-        return JSONResponse(content={
+        return compact_json_response(request, {
             "success": True,
+            "jobId": resultado["jobId"],
             "data": resultado["data"],
-            "urlExcel": resultado["url"]
+            "alertsTotal": resultado["alertsTotal"],
+            "alertsTruncated": resultado["alertsTruncated"],
+            "alertsUrl": resultado["alertsUrl"],
+            "urlExcel": resultado["url"],
+            "urls": resultado["urls"],
+            "traceId": get_current_trace_id(),
         })
 
+    except HTTPException:
+        raise
+    except ArchivoInvalidoError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TrabajoExistenteError as e:
+        # job_id fijado por el cliente que ya pertenece a otro trabajo
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"No se pudo procesar el archivo: {str(e)}")
+
+
+def validar_ruc(ruc) -> str:
+    ruc = normalizar_ruc(ruc)
+    if not ruc_es_valido(ruc):
+        raise HTTPException(status_code=400, detail=f"RUC inválido: {ruc}")
+    return ruc
+
+
+async def lookup_ruc(request: Request, ruc: str):
+    ruc = validar_ruc(ruc)
+    with en_trabajo(nuevo_job_id(), PRIORIDADES["alta"]):
+        resultado = await consultar_ruc(ruc)
+    return compact_json_response(request, {"success": True, "data": resultado})
+
+
+async def lookup_rucs(request: Request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="El cuerpo debe ser JSON")
+
+    rucs = body.get("rucs") if isinstance(body, dict) else body
+    if not isinstance(rucs, list) or not rucs:
+        raise HTTPException(status_code=400, detail="Se espera una lista de RUCs en 'rucs'")
+
+    if len(rucs) > Settings.CONSULTA_LOTE_MAX_RUCS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo {Settings.CONSULTA_LOTE_MAX_RUCS} RUCs por consulta",
+        )
+
+    rucs = [validar_ruc(ruc) for ruc in rucs]
+    with en_trabajo(nuevo_job_id(), PRIORIDADES["alta"]):
+        resultados = await consultar_rucs(rucs)
+    return compact_json_response(request, {"success": True, "data": resultados})
+
+
+def _obtener_traza(job_id: str):
+    traza = get_trace(job_id)
+    if traza is None:
+        raise HTTPException(status_code=404, detail="Traza no encontrada o expirada")
+    return traza
+
+
+async def job_trace(request: Request, job_id: str):
+    return compact_json_response(request, _obtener_traza(job_id).to_dict())
+
+
+async def job_profile(job_id: str):
+    traza = _obtener_traza(job_id)
+    if traza.profile is None:
+        raise HTTPException(status_code=404, detail="El trabajo no se ejecutó con perfilado (header X-Profile: 1)")
+    # Formato "folded": se abre directamente en speedscope o con flamegraph.pl
+    return Response(content=traza.profile, media_type="text/plain; charset=utf-8")
+
+
+TIPOS_RESULTADO = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def etag_archivo(stat) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def etag_coincide(if_none_match: str, etag: str) -> bool:
+    etiquetas = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+    return "*" in etiquetas or etag in etiquetas
+
+
+async def job_result(request: Request, job_id: str, formato: str):
+    if formato not in FORMATOS_EXPORTACION:
+        raise HTTPException(status_code=404, detail=f"Formato no soportado: {formato}")
+
+    ruta = ruta_resultado(job_id, NOMBRE_SALIDA, formato)
+    if ruta is None:
+        raise HTTPException(status_code=404, detail="Resultado no encontrado")
+
+    nombre_descarga = f"{NOMBRE_SALIDA}_{job_id[:8]}.{formato}"
+
+    if trabajo_en_progreso(job_id):
+        if formato not in formatos_en_progreso(job_id):
+            # Sin esto se seguiría un archivo que el trabajo nunca va a escribir
+            raise HTTPException(status_code=404, detail=f"El trabajo no genera el formato {formato}")
+        if formato != "csv":
+            # xlsx y parquet solo son válidos al cerrarse; el CSV sí se puede seguir mientras crece
+            return compact_json_response(
+                request,
+                {"success": False, "message": "El resultado aún se está generando"},
+                status_code=202,
+            )
+        return StreamingResponse(
+            seguir_archivo(ruta, job_id),
+            media_type=TIPOS_RESULTADO[formato],
+            headers={
+                "Cache-Control": "no-store",
+                "Content-Disposition": f'attachment; filename="{nombre_descarga}"',
+            },
+        )
+
+    return respuesta_archivo(request, ruta, TIPOS_RESULTADO[formato], nombre_descarga)
+
+
+async def job_alerts(request: Request, job_id: str):
+    """
+    Lista completa de alertas de una carga por bloques (JSON Lines, una alerta por línea).
+    """
+    if not job_id_valido(job_id):
+        raise HTTPException(status_code=404, detail="Alertas no encontradas")
+    if trabajo_en_progreso(job_id):
+        return compact_json_response(
+            request,
+            {"success": False, "message": "Las alertas aún se están generando"},
+            status_code=202,
+        )
+    ruta = carpeta_trabajo(job_id) / NOMBRE_ALERTAS
+    return respuesta_archivo(request, ruta, "application/x-ndjson", f"alertas_{job_id[:8]}.jsonl")
+
+
+def respuesta_archivo(request: Request, ruta, media_type: str, nombre_descarga: str):
+    if not ruta.is_file():
+        raise HTTPException(status_code=404, detail="Resultado no encontrado o expirado")
+
+    stat = ruta.stat()
+    etag = etag_archivo(stat)
+    headers = {
+        "ETag": etag,
+        # El resultado de un trabajo no cambia: el cliente puede guardarlo, pero debe revalidar
+        "Cache-Control": "private, max-age=0, must-revalidate",
+    }
+
+    if etag_coincide(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse envía el archivo por bloques y atiende Range / If-Range (206 / 416)
+    return FileResponse(
+        ruta,
+        media_type=media_type,
+        filename=nombre_descarga,
+        stat_result=stat,
+        headers=headers,
+    )
@@ -1,14 +1,50 @@
 # src/modules/search/routes/private_routes.py
 from fastapi import APIRouter
-from fastapi import Response
-from modules.search.controllers.private_controller import process_excel
 from fastapi import Request, Response
+from modules.shared.utils.arranque import cargar_modulo
+
+# El controlador arrastra pandas, Playwright y todo el scraping: se importa recién
+# al primer uso (o en el precalentamiento del arranque) para que el servidor acepte
+# conexiones cuanto antes.
+CONTROLADOR = "modules.search.controllers.private_controller"
 
 router = APIRouter()
 
+
+async def controlador():
+    return await cargar_modulo(CONTROLADOR)
+
+
 @router.post("/process-excel")
 async def process_excel_route(request: Request, response: Response):
-    return await process_excel(request, response)
+    return await (await controlador()).process_excel(request, response)
+
+
+@router.get("/ruc/{ruc}")
+async def lookup_ruc_route(request: Request, ruc: str):
+    return await (await controlador()).lookup_ruc(request, ruc)
+
+
+@router.post("/ruc")
+async def lookup_rucs_route(request: Request):
+    return await (await controlador()).lookup_rucs(request)
+
+
+@router.get("/jobs/{job_id}/trace")
+async def job_trace_route(request: Request, job_id: str):
+    return await (await controlador()).job_trace(request, job_id)
+
+
+@router.get("/jobs/{job_id}/profile")
+async def job_profile_route(job_id: str):
+    return await (await controlador()).job_profile(job_id)
+
 
+@router.get("/jobs/{job_id}/result/{formato}")
+async def job_result_route(request: Request, job_id: str, formato: str):
+    return await (await controlador()).job_result(request, job_id, formato)
 
 
+@router.get("/jobs/{job_id}/alerts")
+async def job_alerts_route(request: Request, job_id: str):
+    return await (await controlador()).job_alerts(request, job_id)
@@ -1,26 +1,28 @@
-import pandas as pd
-import io
 from playwright.async_api import async_playwright
 import asyncio
 import time
 import random
 import logging
 from typing import Optional, Dict, Any
+from settings import Settings
+from modules.search.utils.extraccion import CODIGOS_REINFO_INVALIDOS, extraer_codigos_reinfo
+from modules.shared.utils.tracing import span
+from modules.search.utils.navegador import ARGS_CHROMIUM, PoolPaginas, aplicar_bloqueo_recursos
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+REINFO_URL = "https://pad.minem.gob.pe/REINFO_WEB/Index.aspx"
+
+
 class ReinfoScraper:
     def __init__(self):
+        self.playwright = None
         self.browser = None
         self.context = None
-        self.CODIGOS_INVALIDOS = {
-            "750001619", "10149108", "660000314", "70013606", "70005506", "50009409",
-            "10253815", "10125116", "10078012", "10373105", "10419912", "10003298",
-            "740001713", "10285912", "10350212", "740002620", "740000513", "10360012",
-            "510000809", "740000820", "10077712", "730001119", "50011003", "10391208"
-        }
+        self.paginas: Optional[PoolPaginas] = None
+        self.sitio_verificado_en = 0.0
 
     async def __aenter__(self):
         await self.init_browser()
@@ -32,30 +34,8 @@ class ReinfoScraper:
     async def init_browser(self):
         logger.info("🚀 Iniciando navegador...")
         if not self.browser:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu',
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor',
-                    '--disable-background-timer-throttling',
-                    '--disable-backgrounding-occluded-windows',
-                    '--disable-renderer-backgrounding',
-                    '--no-first-run',
-                    '--no-default-browser-check',
-                    '--single-process',
-                    '--memory-pressure-off',
-                    '--disable-extensions',
-                    '--disable-plugins',
-                    '--disable-images',
-                    '--disable-javascript-harmony-shipping',
-                    '--max_old_space_size=4096'
-                ]
-            )
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=True, args=ARGS_CHROMIUM)
             self.context = await self.browser.new_context(
                 user_agent="Mozilla/5.0 (Linux; X11; Ubuntu; rv:109.0) Gecko/20100101 Firefox/119.0",
                 viewport={"width": 1280, "height": 800},
@@ -68,17 +48,24 @@ class ReinfoScraper:
                     "Cache-Control": "no-cache"
                 }
             )
-            await self.context.route("**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2}", lambda route: route.abort())
+            await aplicar_bloqueo_recursos(self.context)
+            self.paginas = PoolPaginas(self.context, Settings.PAGINAS_POR_SCRAPER, self.ir_al_formulario)
             logger.info("✅ Navegador iniciado correctamente")
 
     async def close_browser(self):
         logger.info("🛑 Cerrando navegador...")
+        if self.paginas:
+            await self.paginas.cerrar()
+            self.paginas = None
         if self.context:
             await self.context.close()
             self.context = None
         if self.browser:
             await self.browser.close()
             self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
         logger.info("✅ Navegador cerrado")
 
     def calcular_backoff_delay(self, intento: int, base_delay: float = 2.0, max_delay: float = 30.0) -> float:
@@ -120,69 +107,78 @@ class ReinfoScraper:
                     raise e
 
     async def esperar_carga_completa(self, page, timeout: int):
-        logger.info("⌛ Esperando carga completa de la página")
-        try:
-            await page.wait_for_load_state("networkidle", timeout=timeout * 1000)
-        except:
-            await page.wait_for_load_state("domcontentloaded", timeout=timeout * 1000)
-        await asyncio.sleep(random.uniform(1, 2))
-        logger.info("✅ Página cargada completamente")
+        logger.info("⌛ Esperando formulario de búsqueda")
+        await page.wait_for_selector("#txtruc", state="visible", timeout=timeout * 1000)
+        await page.wait_for_selector("#btnBuscar:not([disabled])", state="visible", timeout=timeout * 1000)
+        logger.info("✅ Formulario listo")
+
+    async def ir_al_formulario(self, page):
+        """
+        Deja la página lista para una nueva búsqueda. Si ya está en el formulario
+        (página caliente) solo se limpia el resultado anterior, sin navegar.
+        """
+        if await page.query_selector("#txtruc") is None:
+            await self.navegar_con_reintentos(page, REINFO_URL)
+            await self.esperar_carga_completa(page, 10)
+        else:
+            # Quitar la tabla anterior para no confundirla con el nuevo resultado
+            await page.evaluate("() => document.querySelector('#stdregistro')?.remove()")
+
+    async def sitio_disponible(self) -> bool:
+        """
+        Verifica REINFO como máximo una vez cada REINFO_VERIFICACION_SEGUNDOS.
+        """
+        if time.monotonic() - self.sitio_verificado_en < Settings.REINFO_VERIFICACION_SEGUNDOS:
+            return True
+        if await self.verificar_conexion_sitio(REINFO_URL, 5):
+            self.sitio_verificado_en = time.monotonic()
+            return True
+        return False
 
     async def obtener_codigo_unico(self, ruc: str, max_intentos: int = 4, timeout_base: int = 25) -> str:
         ruc = str(ruc).strip()
         logger.info(f"🔎 Buscando código único para RUC: {ruc}")
 
-        if not await self.verificar_conexion_sitio("https://pad.minem.gob.pe/REINFO_WEB/Index.aspx", 5):
+        if not await self.sitio_disponible():
             logger.error(f"❌ Sitio REINFO no disponible para RUC {ruc}")
             return "Sitio no disponible"
 
         for intento in range(1, max_intentos + 1):
-            page = None
             try:
                 timeout_actual = timeout_base + (intento * 5)
-                page = await self.context.new_page()
-                page.set_default_timeout(timeout_actual * 1000)
-                page.set_default_navigation_timeout(timeout_actual * 1000)
-
-                logger.info(f"🌐 Intento {intento}/{max_intentos}: navegando al sitio REINFO (timeout: {timeout_actual}s)")
-                await self.navegar_con_reintentos(page, "https://pad.minem.gob.pe/REINFO_WEB/Index.aspx")
-                await self.esperar_carga_completa(page, timeout_actual)
-
-                await page.wait_for_selector("#txtruc", timeout=10000)
-                await page.fill("#txtruc", ruc)
-                await asyncio.sleep(random.uniform(0.5, 1.5))
-                await page.wait_for_selector("#btnBuscar", timeout=5000)
-                await page.click("#btnBuscar")
-
-                await page.wait_for_selector("#stdregistro", timeout=12000)
-
-                html_tabla = await page.evaluate("""
-                    () => {
-                        const table = document.querySelector('#stdregistro');
-                        return table ? table.outerHTML : null;
-                    }
-                """)
-                if not html_tabla:
-                    raise Exception("No se pudo extraer la tabla")
-
-                df_tabla = pd.read_html(io.StringIO(html_tabla), flavor="bs4")[0]
-                if isinstance(df_tabla.columns, pd.MultiIndex):
-                    df_tabla.columns = [' '.join(col).strip() for col in df_tabla.columns]
-
-                if "DERECHO MINERO Código Único" in df_tabla.columns:
-                    codigos = df_tabla["DERECHO MINERO Código Único"].dropna().astype(str).unique()
-                    if set(codigos) == self.CODIGOS_INVALIDOS:
-                        logger.warning(f"⚠️ {ruc} → Conjunto inválido detectado en intento {intento}")
-                        if intento < max_intentos:
-                            raise Exception("Resultado inválido detectado")
+                logger.info(f"🌐 Intento {intento}/{max_intentos}: consultando REINFO (timeout: {timeout_actual}s)")
+
+                with span("reinfo.intento", ruc=ruc, intento=intento) as s:
+                    async with self.paginas.pagina() as page:
+                        page.set_default_timeout(timeout_actual * 1000)
+                        page.set_default_navigation_timeout(timeout_actual * 1000)
+
+                        await page.fill("#txtruc", ruc)
+                        await page.click("#btnBuscar")
+
+                        await page.wait_for_selector("#stdregistro", timeout=12000)
+
+                        tabla = await extraer_codigos_reinfo(page)
+                        if not tabla:
+                            raise Exception("No se pudo extraer la tabla")
+
+                        if tabla["columna"]:
+                            codigos = tabla["valores"]
+                            if set(codigos) == CODIGOS_REINFO_INVALIDOS:
+                                logger.warning(f"⚠️ {ruc} → Conjunto inválido detectado en intento {intento}")
+                                if intento < max_intentos:
+                                    raise Exception("Resultado inválido detectado")
+                                else:
+                                    s.set("resultado", "invalido")
+                                    return "Resultado inválido"
+                            codigo_concatenado = ", ".join(codigos)
+                            logger.info(f"✅ {ruc} → {codigo_concatenado}")
+                            s.set("resultado", "encontrado")
+                            return codigo_concatenado
                         else:
-                            return "Resultado inválido"
-                    codigo_concatenado = ", ".join(codigos)
-                    logger.info(f"✅ {ruc} → {codigo_concatenado}")
-                    return codigo_concatenado
-                else:
-                    logger.warning(f"⚠️ {ruc} → Columna 'Código Único' no encontrada")
-                    return "No tiene REINFO"
+                            logger.warning(f"⚠️ {ruc} → Columna 'Código Único' no encontrada")
+                            s.set("resultado", "sin_reinfo")
+                            return "No tiene REINFO"
 
             except Exception as e:
                 logger.error(f"❌ Error RUC {ruc} (intento {intento}): {str(e)}")
@@ -193,9 +189,6 @@ class ReinfoScraper:
                 else:
                     logger.error(f"⛔ Máximo de intentos alcanzado para RUC {ruc}")
                     return "Error de timeout"
-            finally:
-                if page:
-                    await page.close()
 
         return "Error"
 
@@ -205,7 +198,7 @@ async def obtener_codigo_unico(ruc: str, max_intentos: int = 4, espera_reintento
 
 async def verificar_sitio_reinfo() -> Dict[str, Any]:
     async with ReinfoScraper() as scraper:
-        disponible = await scraper.verificar_conexion_sitio("https://pad.minem.gob.pe/REINFO_WEB/Index.aspx", 5)
+        disponible = await scraper.verificar_conexion_sitio(REINFO_URL, 5)
 
         print(f"✅ Código de estado HTTP: {disponible.status_code}")
         print("🧾 Contenido inicial de la respuesta:")
@@ -213,28 +206,9 @@ async def verificar_sitio_reinfo() -> Dict[str, Any]:
         return {
             "disponible": disponible,
             "timestamp": time.time(),
-            "url": "https://pad.minem.gob.pe/REINFO_WEB/Index.aspx"
+            "url": REINFO_URL
         }
 
-async def agregar_codigo_unico_al_df(df: pd.DataFrame, columna_ruc: str = "ruc") -> pd.DataFrame:
-    df = df.copy()
-    codigos = []
-
-    async with ReinfoScraper() as scraper:
-        for idx, row in df.iterrows():
-            ruc = str(row[columna_ruc])
-            logger.info(f"🔄 Procesando RUC {ruc} (fila {idx})...")
-            try:
-                codigo = await scraper.obtener_codigo_unico(ruc)
-            except Exception as e:
-                logger.error(f"❌ Error al obtener código único para {ruc}: {e}")
-                codigo = "Error"
-            codigos.append(codigo)
-            await asyncio.sleep(random.uniform(0.5, 1.5))  # pequeña pausa para evitar sobrecarga
-
-    df["Código Único"] = codigos
-    return df
-
 if __name__ == "__main__":
     async def test():
         print("🧪 Iniciando prueba...")
@@ -1,55 +1,115 @@
 # src/modules/search/utils/consulta_ruc.py 
 import asyncio
 import random
-import re
-from bs4 import BeautifulSoup
-import pandas as pd
+from typing import Optional
 from playwright.async_api import async_playwright
+from settings import Settings
+from modules.search.utils.extraccion import extraer_actividades_sunat
+from modules.search.utils.navegador import ARGS_CHROMIUM, PoolPaginas, aplicar_bloqueo_recursos
+from modules.search.utils.normalizacion_ruc import normalizar_ruc
+from modules.shared.utils.tracing import span
 
 PALABRAS_MINERIA = ["mineral", "minería", "extracción", "comercialización de minerales"]
 
 def actividad_es_mineria(actividad: str) -> bool:
     return any(p in actividad.lower() for p in PALABRAS_MINERIA)
 
-async def consultar_ruc_sunat(ruc: str, reintentos=3) -> dict:
-    ruc = str(int(float(ruc)))  # asegurar formato limpio
-
-    for intento in range(1, reintentos + 1):
-        browser = None
-        try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    viewport={"width": 1280, "height": 800},
-                    locale="es-PE"
-                )
-                page = await context.new_page()
-
-                print(f"🌐 Intento {intento}: Navegando a SUNAT para RUC {ruc}")
-                await page.goto("https://e-consultaruc.sunat.gob.pe/cl-ti-itmrconsruc/FrameCriterioBusquedaWeb.jsp", timeout=20000)
-
-                # Usamos el frame por si aún existe, pero validamos también si está directamente en la página
-                frame = page.frame(name="main") or page.main_frame
-
-                # Esperar el input y botón
-                await frame.wait_for_selector("#txtRuc", timeout=10000)
-                await frame.fill("#txtRuc", ruc)
-                await asyncio.sleep(random.uniform(1, 2))
-                await frame.click("#btnAceptar")
-
-                # Esperar carga de resultado
-                await page.wait_for_url("**/jcrS00Alias", timeout=15000)
-                await page.wait_for_selector(".panel.panel-primary", timeout=10000)
-
-                # Extraer HTML y parsear
-                html = await page.content()
-                soup = BeautifulSoup(html, "html.parser")
-                actividades = [
-                    td.text.strip()
-                    for td in soup.select("td")
-                    if re.search(r'(Principal|Secundaria)\s*-\s*\d{4}', td.text)
-                ]
+SUNAT_URL = "https://e-consultaruc.sunat.gob.pe/cl-ti-itmrconsruc/FrameCriterioBusquedaWeb.jsp"
+
+
+class SunatScraper:
+    """
+    Mantiene un navegador y páginas calientes en el formulario de consulta RUC de SUNAT.
+    """
+
+    def __init__(self):
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.paginas: Optional[PoolPaginas] = None
+
+    async def __aenter__(self):
+        await self.init_browser()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close_browser()
+
+    async def init_browser(self):
+        if not self.browser:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=True, args=ARGS_CHROMIUM)
+            self.context = await self.browser.new_context(
+                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                viewport={"width": 1280, "height": 800},
+                locale="es-PE"
+            )
+            await aplicar_bloqueo_recursos(self.context)
+            self.paginas = PoolPaginas(self.context, Settings.PAGINAS_POR_SCRAPER, self.ir_al_formulario)
+            print("✅ Navegador SUNAT iniciado")
+
+    async def close_browser(self):
+        if self.paginas:
+            await self.paginas.cerrar()
+            self.paginas = None
+        if self.context:
+            await self.context.close()
+            self.context = None
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+    @staticmethod
+    def formulario(page):
+        # Usamos el frame por si aún existe, pero validamos también si está directamente en la página
+        return page.frame(name="main") or page.main_frame
+
+    async def ir_al_formulario(self, page):
+        """
+        Vuelve al formulario de búsqueda: primero con "atrás" (sin recargar todo)
+        y, si no queda en el formulario, navegando de nuevo.
+        """
+        if await self.formulario(page).query_selector("#txtRuc") is not None:
+            return
+
+        if page.url != "about:blank":
+            try:
+                await page.go_back(wait_until="domcontentloaded", timeout=10000)
+                await self.formulario(page).wait_for_selector("#txtRuc", state="visible", timeout=5000)
+                return
+            except Exception:
+                pass
+
+        print("🌐 Navegando al formulario de SUNAT")
+        await page.goto(SUNAT_URL, wait_until="domcontentloaded", timeout=20000)
+        await self.formulario(page).wait_for_selector("#txtRuc", state="visible", timeout=10000)
+
+    async def consultar_ruc(self, ruc: str, reintentos=3) -> dict:
+        ruc = normalizar_ruc(ruc)  # asegurar formato limpio
+
+        for intento in range(1, reintentos + 1):
+            try:
+                with span("sunat.intento", ruc=ruc, intento=intento) as s:
+                    async with self.paginas.pagina() as page:
+                        print(f"🌐 Intento {intento}: consultando SUNAT para RUC {ruc}")
+                        frame = self.formulario(page)
+
+                        # Esperar el input y botón habilitados antes de enviar
+                        await frame.fill("#txtRuc", ruc)
+                        await frame.wait_for_selector("#btnAceptar:not([disabled])", timeout=10000)
+                        await frame.click("#btnAceptar")
+
+                        # Esperar carga de resultado
+                        await page.wait_for_url("**/jcrS00Alias", timeout=15000)
+                        await page.wait_for_selector(".panel.panel-primary", timeout=10000)
+
+                        # Extraer solo las actividades dentro de la página
+                        actividades = await extraer_actividades_sunat(page)
+                        s.set("actividades", len(actividades))
+
                 actividad_str = "; ".join(actividades)
                 alerta = "Normal" if actividad_es_mineria(actividad_str) else "⚠️ Actividad no minera"
 
@@ -61,33 +121,13 @@ async def consultar_ruc_sunat(ruc: str, reintentos=3) -> dict:
                     "alerta": alerta
                 }
 
-        except Exception as e:
-            print(f"❌ Error en intento {intento} para RUC {ruc}: {e}")
-            await asyncio.sleep(random.uniform(5, 10))  # evitar bloqueo
-
-        finally:
-            if browser:
-                await browser.close()
-
-    return {
-        "ruc": ruc,
-        "actividad_economica": "Error",
-        "alerta": f"❌ No se pudo consultar tras {reintentos} intentos"
-    }
-
-async def procesar_df_rucs(df: pd.DataFrame, columna_ruc="ruc") -> pd.DataFrame:
-    resultados = []
-    df_2 = df.drop_duplicates(subset=[columna_ruc], keep="first")
-    
-    for ruc in df_2[columna_ruc].dropna().astype(str).unique():
-        resultado = await consultar_ruc_sunat(ruc)
-        resultados.append(resultado)
-        await asyncio.sleep(random.uniform(1, 1.5))
-    
-    print(resultados)
-    df_resultados = pd.DataFrame(resultados)
-    df[columna_ruc] = df[columna_ruc].astype(str)
-    df_resultados[columna_ruc] = df_resultados[columna_ruc].astype(str)
-    df_final = df.merge(df_resultados, on=columna_ruc, how='left')
-    
-    return df_final
+            except Exception as e:
+                print(f"❌ Error en intento {intento} para RUC {ruc}: {e}")
+                await asyncio.sleep(random.uniform(5, 10))  # evitar bloqueo
+
+        return {
+            "ruc": ruc,
+            "actividad_economica": "Error",
+            "alerta": f"❌ No se pudo consultar tras {reintentos} intentos"
+        }
+
@@ -0,0 +1,364 @@
+# src/modules/search/utils/consulta_unificada.py
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import pandas as pd
+from cachetools import TTLCache
+
+from settings import Settings
+from modules.search.utils.consulta_ruc import SunatScraper
+from modules.search.utils.consulta_reinfo import ReinfoScraper
+from modules.search.utils.consultas_redundantes import ConsultaRedundante
+from modules.search.utils.extraccion import RESULTADOS_ERROR_REINFO
+from modules.search.utils.planificador import Planificador, trabajo_actual
+from modules.search.utils.normalizacion_ruc import normalizar_ruc
+from modules.shared.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+CARPETA_RECPO = Path(__file__).resolve().parent
+
+# Reglas de alerta (las mismas que aplica validacion_total sobre el DataFrame)
+PATRON_ACTIVIDAD_MINERA = "MINERA|EXTRACCIÓN"
+CODIGOS_SIN_REINFO = ["No tiene REINFO", "Error"]
+SIN_RECPO = "⚠️ No tiene RECPO"
+
+_cache_sunat: TTLCache = TTLCache(maxsize=Settings.CACHE_CONSULTAS_MAX, ttl=Settings.CACHE_CONSULTAS_TTL_SEGUNDOS)
+_cache_reinfo: TTLCache = TTLCache(maxsize=Settings.CACHE_CONSULTAS_MAX, ttl=Settings.CACHE_CONSULTAS_TTL_SEGUNDOS)
+_en_curso: Dict[tuple, asyncio.Task] = {}
+# Momento (time.monotonic) en que se guardó cada resultado, para refrescarlo antes de que venza
+_guardado_en: TTLCache = TTLCache(maxsize=2 * Settings.CACHE_CONSULTAS_MAX, ttl=Settings.CACHE_CONSULTAS_TTL_SEGUNDOS)
+# RUCs de las últimas cargas, del más antiguo al más reciente
+_rucs_recientes: "OrderedDict[str, None]" = OrderedDict()
+
+# Capacidad global por sitio, compartida entre todos los trabajos con encolado justo
+PLANIFICADORES = {
+    "sunat": Planificador("sunat", Settings.CAPACIDAD_SUNAT),
+    "reinfo": Planificador("reinfo", Settings.CAPACIDAD_REINFO),
+}
+
+_redundancia = {
+    fuente: ConsultaRedundante(
+        fuente,
+        percentil=Settings.REDUNDANCIA_PERCENTIL,
+        presupuesto=Settings.REDUNDANCIA_PRESUPUESTO,
+        minimo_muestras=Settings.REDUNDANCIA_MIN_MUESTRAS,
+        umbral_minimo=Settings.REDUNDANCIA_UMBRAL_MINIMO_SEGUNDOS,
+    )
+    for fuente in ("sunat", "reinfo")
+}
+
+_scraper_reinfo: Optional[ReinfoScraper] = None
+_scraper_sunat: Optional[SunatScraper] = None
+_lock_scrapers = asyncio.Lock()
+
+_recpo: Dict[str, str] = {}
+_recpo_ruta: Optional[Path] = None
+
+
+# ------------------------------------------------------------------ RECPO
+
+def ruta_recpo_actual() -> Optional[Path]:
+    """
+    Devuelve el archivo RECPO del mes o, si aún no se generó, el más reciente disponible.
+    """
+    ruta_mes = CARPETA_RECPO / f"recpo_{datetime.now().strftime('%Y-%m')}.xlsx"
+    if ruta_mes.exists():
+        return ruta_mes
+
+    disponibles = sorted(CARPETA_RECPO.glob("recpo_*.xlsx"))
+    return disponibles[-1] if disponibles else None
+
+
+def obtener_registros_recpo() -> Dict[str, str]:
+    """
+    Devuelve el mapa RUC -> N° Registro del RECPO, leyendo el Excel solo cuando cambia de archivo.
+    """
+    global _recpo, _recpo_ruta
+
+    ruta = ruta_recpo_actual()
+    if ruta is None:
+        print("⚠️ No existe ningún archivo RECPO.")
+        return {}
+
+    if ruta != _recpo_ruta:
+        df_recpo = pd.read_excel(ruta, usecols=["ruc", "N° Registro"], dtype=str)
+        df_recpo = df_recpo.dropna(subset=["ruc"])
+        _recpo = dict(zip(df_recpo["ruc"].map(normalizar_ruc), df_recpo["N° Registro"]))
+        _recpo_ruta = ruta
+        print(f"✅ recpo cargado correctamente ({ruta.name})")
+
+    return _recpo
+
+
+# ------------------------------------------------------------------ Navegadores compartidos
+
+async def _iniciar_navegador(scraper):
+    """
+    Inicia el navegador del scraper. Si falla a mitad de camino (p. ej. el driver de
+    Playwright arrancó pero Chromium no), cierra lo que quedó abierto antes de propagar
+    el error: el arranque reintenta y cada intento fallido dejaría un driver vivo.
+    """
+    try:
+        await scraper.init_browser()
+    except BaseException:
+        try:
+            await scraper.close_browser()
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo cerrar el navegador tras la falla: {e}")
+        raise
+
+async def obtener_scraper_reinfo() -> ReinfoScraper:
+    """
+    Devuelve un ReinfoScraper compartido, iniciando el navegador la primera vez.
+    """
+    global _scraper_reinfo
+
+    async with _lock_scrapers:
+        if _scraper_reinfo is None:
+            scraper = ReinfoScraper()
+            await _iniciar_navegador(scraper)
+            _scraper_reinfo = scraper
+    return _scraper_reinfo
+
+
+async def obtener_scraper_sunat() -> SunatScraper:
+    """
+    Devuelve un SunatScraper compartido, iniciando el navegador la primera vez.
+    """
+    global _scraper_sunat
+
+    async with _lock_scrapers:
+        if _scraper_sunat is None:
+            scraper = SunatScraper()
+            await _iniciar_navegador(scraper)
+            _scraper_sunat = scraper
+    return _scraper_sunat
+
+
+async def cerrar_scrapers():
+    global _scraper_reinfo, _scraper_sunat
+
+    async with _lock_scrapers:
+        if _scraper_reinfo is not None:
+            await _scraper_reinfo.close_browser()
+            _scraper_reinfo = None
+        if _scraper_sunat is not None:
+            await _scraper_sunat.close_browser()
+            _scraper_sunat = None
+
+
+async def _consultar_reinfo(ruc: str) -> str:
+    scraper = await obtener_scraper_reinfo()
+    return await scraper.obtener_codigo_unico(ruc)
+
+
+async def _consultar_sunat(ruc: str) -> Dict[str, str]:
+    scraper = await obtener_scraper_sunat()
+    return await scraper.consultar_ruc(ruc)
+
+
+# ------------------------------------------------------------------ Caché y deduplicación
+
+async def _consulta_compartida(
+    fuente: str,
+    ruc: str,
+    cache: TTLCache,
+    consulta: Callable[[str], Awaitable[Any]],
+    es_error: Callable[[Any], bool],
+) -> Any:
+    """
+    Responde desde caché si puede; si no, une la llamada a la consulta en curso
+    para el mismo RUC o lanza una nueva.
+    """
+    with span(f"{fuente}.buscar", ruc=ruc) as s:
+        if ruc in cache:
+            s.set("origen", "cache")
+            return cache[ruc]
+
+        clave = (fuente, ruc)
+        tarea = _en_curso.get(clave)
+        s.set("origen", "en_curso" if tarea is not None else "consulta")
+        if tarea is None:
+            tarea = _iniciar_consulta(fuente, ruc, cache, consulta, es_error)
+        else:
+            logger.info(f"🔗 {fuente} {ruc}: uniéndose a consulta en curso")
+            # Si esa consulta aún espera cupo, pasa a esperar con el turno de este trabajo si es mejor
+            if PLANIFICADORES[fuente].promover(clave, trabajo_actual()):
+                s.set("promovida", True)
+
+        # shield: si un cliente se desconecta no se cancela la consulta de los demás
+        return await asyncio.shield(tarea)
+
+
+def _tomar_cupo_redundante(fuente: str) -> bool:
+    """
+    El intento redundante necesita su propio cupo del planificador y una página libre;
+    si falta cualquiera de los dos no se lanza (nunca espera ni excede la capacidad).
+    """
+    scraper = _scraper_sunat if fuente == "sunat" else _scraper_reinfo
+    if scraper is None or scraper.paginas is None or not scraper.paginas.hay_libre():
+        return False
+    return PLANIFICADORES[fuente].intentar_adquirir()
+
+
+def _iniciar_consulta(
+    fuente: str,
+    ruc: str,
+    cache: TTLCache,
+    consulta: Callable[[str], Awaitable[Any]],
+    es_error: Callable[[Any], bool],
+) -> asyncio.Task:
+    clave = (fuente, ruc)
+
+    planificador = PLANIFICADORES[fuente]
+    trabajo = trabajo_actual()
+
+    async def ejecutar():
+        with span(f"{fuente}.espera_cupo", trabajo=trabajo.id, prioridad=trabajo.prioridad):
+            await planificador.adquirir(trabajo, clave)
+        try:
+            if Settings.CONSULTAS_REDUNDANTES:
+                resultado = await _redundancia[fuente].ejecutar(
+                    lambda: consulta(ruc), es_error,
+                    tomar_cupo=lambda: _tomar_cupo_redundante(fuente),
+                    liberar_cupo=planificador.liberar,
+                )
+            else:
+                resultado = await consulta(ruc)
+        finally:
+            planificador.liberar()
+        if not es_error(resultado):
+            cache[ruc] = resultado
+            _guardado_en[clave] = time.monotonic()
+        return resultado
+
+    tarea = asyncio.create_task(ejecutar())
+    _en_curso[clave] = tarea
+    tarea.add_done_callback(lambda _: _en_curso.pop(clave, None))
+    return tarea
+
+
+def _es_error_sunat(resultado: Dict[str, str]) -> bool:
+    return resultado.get("actividad_economica") == "Error"
+
+
+def _es_error_reinfo(resultado: str) -> bool:
+    return resultado in RESULTADOS_ERROR_REINFO
+
+
+_fuentes = {
+    "sunat": (_cache_sunat, _consultar_sunat, _es_error_sunat),
+    "reinfo": (_cache_reinfo, _consultar_reinfo, _es_error_reinfo),
+}
+
+
+async def consultar_sunat(ruc: str) -> Dict[str, str]:
+    return await _consulta_compartida("sunat", ruc, *_fuentes["sunat"])
+
+
+async def consultar_reinfo(ruc: str) -> str:
+    return await _consulta_compartida("reinfo", ruc, *_fuentes["reinfo"])
+
+
+def antiguedad_en_cache(fuente: str, ruc: str) -> Optional[float]:
+    """
+    Segundos desde que se guardó el resultado del RUC, o None si no está en caché.
+    """
+    cache = _fuentes[fuente][0]
+    guardado = _guardado_en.get((fuente, ruc))
+    if guardado is None or ruc not in cache:
+        return None
+    return time.monotonic() - guardado
+
+
+async def refrescar(fuente: str, ruc: str) -> bool:
+    """
+    Vuelve a consultar el RUC aunque esté en caché. Si la consulta falla se conserva
+    el resultado anterior. Devuelve True si se obtuvo un resultado válido.
+    """
+    cache, consulta, es_error = _fuentes[fuente]
+    tarea = _en_curso.get((fuente, ruc)) or _iniciar_consulta(fuente, ruc, cache, consulta, es_error)
+    return not es_error(await asyncio.shield(tarea))
+
+
+def registrar_rucs_recientes(rucs: List[str]) -> None:
+    for ruc in rucs:
+        _rucs_recientes[ruc] = None
+        _rucs_recientes.move_to_end(ruc)
+    while len(_rucs_recientes) > Settings.PRECALENTAMIENTO_MAX_RUCS:
+        _rucs_recientes.popitem(last=False)
+
+
+def rucs_recientes() -> List[str]:
+    """
+    RUCs de las cargas recientes, del más reciente al más antiguo.
+    """
+    return list(reversed(_rucs_recientes))
+
+
+# ------------------------------------------------------------------ Resultado
+
+def evaluar_alertas(actividad: str, codigo_unico: str, recpo: str) -> Dict[str, bool]:
+    codigo = str(codigo_unico).strip()
+    return {
+        "nonMiningActivity": not re.search(PATRON_ACTIVIDAD_MINERA, str(actividad), re.IGNORECASE),
+        "noReinfo": codigo in CODIGOS_SIN_REINFO,
+        "reinfoError": codigo == "Error",
+        "noRecpo": "no tiene" in str(recpo).lower(),
+    }
+
+
+async def consultar_ruc(ruc: str) -> Dict[str, Any]:
+    """
+    Consulta SUNAT, REINFO y RECPO para un RUC y devuelve el resultado con sus alertas.
+    """
+    ruc = normalizar_ruc(ruc)
+
+    sunat, codigo_unico = await asyncio.gather(consultar_sunat(ruc), consultar_reinfo(ruc))
+    recpo = obtener_registros_recpo().get(ruc, SIN_RECPO)
+
+    alertas = evaluar_alertas(sunat["actividad_economica"], codigo_unico, recpo)
+    return {
+        "ruc": ruc,
+        "economicActivity": sunat["actividad_economica"],
+        "sunatAlert": sunat["alerta"],
+        "uniqueCode": codigo_unico,
+        "recpo": recpo,
+        "alerts": alertas,
+        "hasAlerts": any(alertas.values()),
+    }
+
+
+async def consultar_fuentes(rucs: List[str]) -> pd.DataFrame:
+    """
+    Consulta SUNAT y REINFO una vez por cada RUC único y devuelve un DataFrame
+    indexado por RUC, listo para unirse a las filas de la carga.
+    """
+    rucs = list(dict.fromkeys(rucs))
+    registrar_rucs_recientes(rucs)
+    with span("sunat.lote", rucs=len(rucs)):
+        sunat = await asyncio.gather(*(consultar_sunat(r) for r in rucs))
+    with span("reinfo.lote", rucs=len(rucs)):
+        codigos = await asyncio.gather(*(consultar_reinfo(r) for r in rucs))
+
+    return pd.DataFrame({
+        "actividad_economica": [s["actividad_economica"] for s in sunat],
+        "alerta": [s["alerta"] for s in sunat],
+        "Código Único": codigos,
+    }, index=pd.Index(rucs, name="ruc", dtype="string"), dtype=object)  # texto aunque no haya RUCs
+
+
+async def consultar_rucs(rucs: List[str]) -> List[Dict[str, Any]]:
+    """
+    Consulta varios RUCs a la vez; los repetidos se resuelven una sola vez.
+    """
+    unicos = list(dict.fromkeys(normalizar_ruc(r) for r in rucs))
+    resultados = await asyncio.gather(*(consultar_ruc(r) for r in unicos))
+    return list(resultados)
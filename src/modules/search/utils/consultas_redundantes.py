@@ -0,0 +1,122 @@
+# src/modules/search/utils/consultas_redundantes.py
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ConsultaRedundante:
+    """
+    Consultas redundantes ("hedged requests") contra un sitio externo: si una consulta
+    tarda más que el percentil configurado de las latencias recientes, se lanza un
+    segundo intento en otra página y gana el primero que responda bien; el otro se cancela.
+
+    Un presupuesto limita los intentos extra a una fracción de las consultas totales.
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        percentil: float,
+        presupuesto: float,
+        minimo_muestras: int = 20,
+        umbral_minimo: float = 2.0,
+        ventana: int = 200,
+    ):
+        self.nombre = nombre
+        self.percentil = percentil
+        self.presupuesto = presupuesto
+        self.minimo_muestras = minimo_muestras
+        self.umbral_minimo = umbral_minimo
+        self.latencias: Deque[float] = deque(maxlen=ventana)
+        self.consultas = 0
+        self.redundantes = 0
+
+    def umbral(self) -> Optional[float]:
+        """
+        Percentil de las latencias recientes (en segundos), o None si aún no hay muestras suficientes.
+        """
+        if len(self.latencias) < self.minimo_muestras:
+            return None
+        ordenadas = sorted(self.latencias)
+        indice = max(0, math.ceil(self.percentil / 100 * len(ordenadas)) - 1)
+        return max(ordenadas[indice], self.umbral_minimo)
+
+    def hay_presupuesto(self) -> bool:
+        return self.redundantes + 1 <= self.presupuesto * self.consultas
+
+    async def _medir(self, consulta: Callable[[], Awaitable[Any]]) -> Any:
+        inicio = time.monotonic()
+        try:
+            return await consulta()
+        finally:
+            # También se registra el tiempo de los intentos cancelados (eran los lentos)
+            self.latencias.append(time.monotonic() - inicio)
+
+    async def ejecutar(
+        self,
+        consulta: Callable[[], Awaitable[Any]],
+        es_error: Callable[[Any], bool],
+        tomar_cupo: Optional[Callable[[], bool]] = None,
+        liberar_cupo: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """
+        `tomar_cupo` reserva sin esperar la capacidad del intento redundante (y `liberar_cupo`
+        la devuelve al terminar): si no hay capacidad libre no se lanza el intento extra.
+        """
+        self.consultas += 1
+        umbral = self.umbral()
+        tareas: List[asyncio.Task] = [asyncio.create_task(self._medir(consulta))]
+
+        try:
+            if umbral is None:
+                return await tareas[0]
+
+            hechas, _ = await asyncio.wait(tareas, timeout=umbral)
+            if hechas or not self.hay_presupuesto():
+                return await tareas[0]
+
+            if tomar_cupo is not None and not tomar_cupo():
+                logger.info(f"🪂 {self.nombre}: sin capacidad libre para un intento redundante")
+                return await tareas[0]
+
+            self.redundantes += 1
+            logger.info(f"🪂 {self.nombre}: sin respuesta tras {umbral:.1f}s, lanzando intento redundante")
+            redundante = asyncio.create_task(self._medir(consulta))
+            if liberar_cupo is not None:
+                redundante.add_done_callback(lambda _: liberar_cupo())
+            tareas.append(redundante)
+            return await self._primera_valida(tareas, es_error, espera_maxima=umbral)
+        finally:
+            for tarea in tareas:
+                if not tarea.done():
+                    tarea.cancel()
+
+    @staticmethod
+    async def _primera_valida(tareas: List[asyncio.Task], es_error: Callable[[Any], bool], espera_maxima: float) -> Any:
+        """
+        Devuelve el primer resultado sin error; si no lo hay, el del intento original.
+        Una vez que el original terminó con error, el redundante tiene a lo sumo
+        `espera_maxima` segundos más para responder.
+        """
+        loop = asyncio.get_running_loop()
+        original = tareas[0]
+        limite: Optional[float] = None
+        pendientes = set(tareas)
+
+        while pendientes:
+            espera = None if limite is None else max(0.0, limite - loop.time())
+            hechas, pendientes = await asyncio.wait(pendientes, timeout=espera, return_when=asyncio.FIRST_COMPLETED)
+            if not hechas:
+                break  # el redundante agotó su espera
+            for tarea in hechas:
+                if tarea.exception() is None and not es_error(tarea.result()):
+                    return tarea.result()
+            if original.done() and limite is None:
+                limite = loop.time() + espera_maxima
+
+        return original.result()
@@ -0,0 +1,106 @@
+# src/modules/search/utils/exportacion.py
+import importlib.util
+from pathlib import Path
+from typing import Dict, Iterable, Set
+
+import openpyxl
+import pandas as pd
+
+FORMATOS_EXPORTACION = ("xlsx", "csv", "parquet")
+
+
+def formatos_disponibles(incremental: bool = False) -> Set[str]:
+    """
+    Parquet solo está disponible si hay un motor instalado (pyarrow o fastparquet).
+    La escritura por bloques de parquet requiere pyarrow.
+    """
+    disponibles = {"xlsx", "csv"}
+    motores = ("pyarrow",) if incremental else ("pyarrow", "fastparquet")
+    if any(importlib.util.find_spec(m) is not None for m in motores):
+        disponibles.add("parquet")
+    return disponibles
+
+
+def exportar_resultado(df: pd.DataFrame, carpeta: Path, nombre_base: str, formatos: Iterable[str]) -> Dict[str, Path]:
+    """
+    Guarda el resultado en cada formato pedido y devuelve {formato: ruta}.
+    """
+    carpeta.mkdir(parents=True, exist_ok=True)
+    rutas = {}
+
+    for formato in dict.fromkeys(formatos):
+        ruta = carpeta / f"{nombre_base}.{formato}"
+        if formato == "xlsx":
+            df.to_excel(ruta, index=False)
+        elif formato == "csv":
+            # utf-8-sig para que Excel muestre bien las tildes al abrirlo
+            df.to_csv(ruta, index=False, encoding="utf-8-sig")
+        elif formato == "parquet":
+            df.astype({c: "string" for c in df.select_dtypes("object").columns}).to_parquet(ruta, index=False)
+        else:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        rutas[formato] = ruta
+        print(f"✅ Archivo guardado en: {ruta}")
+
+    return rutas
+
+
+class EscritorIncremental:
+    """
+    Escribe el resultado bloque a bloque sin tener el DataFrame completo en memoria:
+    xlsx con openpyxl en modo write_only, csv anexando filas y parquet con pyarrow.
+    """
+
+    def __init__(self, carpeta: Path, nombre_base: str, formatos: Iterable[str]):
+        carpeta.mkdir(parents=True, exist_ok=True)
+        self.rutas: Dict[str, Path] = {}
+        for formato in dict.fromkeys(formatos):
+            if formato not in FORMATOS_EXPORTACION:
+                raise ValueError(f"Formato de exportación no soportado: {formato}")
+            self.rutas[formato] = carpeta / f"{nombre_base}.{formato}"
+
+        self.filas = 0
+        self._libro = None
+        self._hoja = None
+        self._parquet = None
+
+    def escribir(self, df: pd.DataFrame):
+        primero = self.filas == 0
+
+        for formato, ruta in self.rutas.items():
+            if formato == "xlsx":
+                if self._hoja is None:
+                    self._libro = openpyxl.Workbook(write_only=True)
+                    self._hoja = self._libro.create_sheet()
+                    self._hoja.append([str(c) for c in df.columns])
+                for fila in df.itertuples(index=False, name=None):
+                    self._hoja.append([None if pd.isna(v) else v for v in fila])
+            elif formato == "csv":
+                # El BOM de utf-8-sig solo va al inicio del archivo
+                df.to_csv(
+                    ruta, index=False, header=primero, mode="w" if primero else "a",
+                    encoding="utf-8-sig" if primero else "utf-8",
+                )
+            elif formato == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                tabla = pa.Table.from_pandas(df.astype("string"), preserve_index=False)
+                if self._parquet is None:
+                    self._parquet = pq.ParquetWriter(ruta, tabla.schema)
+                self._parquet.write_table(tabla)
+
+        self.filas += len(df)
+
+    def cerrar(self) -> Dict[str, Path]:
+        if "xlsx" in self.rutas:
+            if self._libro is None:
+                self._libro = openpyxl.Workbook(write_only=True)
+                self._libro.create_sheet()
+            self._libro.save(self.rutas["xlsx"])
+        if self._parquet is not None:
+            self._parquet.close()
+
+        for ruta in self.rutas.values():
+            print(f"✅ Archivo guardado en: {ruta} ({self.filas} filas)")
+        return self.rutas
@@ -0,0 +1,114 @@
+# src/modules/search/utils/extraccion.py
+# Extracción estructurada dentro de la página: los selectores corren en el navegador
+# y a Python solo llegan los campos necesarios como JSON, sin transferir ni parsear el HTML.
+import re
+from typing import List, Optional, TypedDict
+
+COLUMNA_CODIGO_UNICO = "DERECHO MINERO Código Único"
+
+# Resultado que REINFO devuelve a veces para cualquier RUC (respuesta de otra consulta).
+# Está en el formato histórico de los códigos: sin ceros a la izquierda (ver normalizar_codigos_reinfo).
+CODIGOS_REINFO_INVALIDOS = {
+    "750001619", "10149108", "660000314", "70013606", "70005506", "50009409",
+    "10253815", "10125116", "10078012", "10373105", "10419912", "10003298",
+    "740001713", "10285912", "10350212", "740002620", "740000513", "10360012",
+    "510000809", "740000820", "10077712", "730001119", "50011003", "10391208"
+}
+PATRON_CODIGO_NUMERICO = re.compile(r"[0-9]+")
+
+# Resultados que indican una falla temporal de la consulta: no se guardan en caché ni se reutilizan
+RESULTADOS_ERROR_REINFO = {"Error", "Error de timeout", "Sitio no disponible", "Resultado inválido"}
+
+# Celdas de actividad económica de la ficha RUC, p. ej. "Principal - 0729 - EXTRACCIÓN DE ..."
+JS_ACTIVIDADES_SUNAT = r"""
+() => {
+    const patron = /(Principal|Secundaria)\s*-\s*\d{4}/;
+    return Array.from(document.querySelectorAll('td'))
+        .map(td => td.textContent)
+        .filter(texto => patron.test(texto))
+        .map(texto => texto.trim());
+}
+"""
+
+# Valores únicos de una columna de #stdregistro. El encabezado tiene dos niveles con
+# colspan/rowspan, así que se arma la grilla y cada etiqueta une sus niveles con un
+# espacio (igual que pd.read_html con MultiIndex).
+JS_COLUMNA_REINFO = r"""
+(columna) => {
+    const tabla = document.querySelector('#stdregistro');
+    if (!tabla) return null;
+
+    const filas = Array.from(tabla.rows);
+    const esEncabezado = fila =>
+        fila.parentElement.tagName === 'THEAD' ||
+        Array.from(fila.cells).every(celda => celda.tagName === 'TH');
+
+    let inicio = 0;
+    while (inicio < filas.length && esEncabezado(filas[inicio])) inicio++;
+
+    const grilla = [];
+    filas.slice(0, inicio).forEach((fila, f) => {
+        grilla[f] = grilla[f] || [];
+        let c = 0;
+        for (const celda of fila.cells) {
+            while (grilla[f][c] !== undefined) c++;
+            const texto = celda.textContent.replace(/\s+/g, ' ').trim();
+            for (let df = 0; df < celda.rowSpan; df++) {
+                grilla[f + df] = grilla[f + df] || [];
+                for (let dc = 0; dc < celda.colSpan; dc++) grilla[f + df][c + dc] = texto;
+            }
+            c += celda.colSpan;
+        }
+    });
+
+    const niveles = grilla.slice(0, inicio);
+    const ancho = Math.max(0, ...niveles.map(nivel => nivel.length));
+    let indice = -1;
+    for (let c = 0; c < ancho && indice < 0; c++) {
+        const etiqueta = niveles.map(nivel => nivel[c] || '').join(' ').trim();
+        if (etiqueta === columna) indice = c;
+    }
+    if (indice < 0) return { columna: false, valores: [] };
+
+    const valores = [];
+    for (const fila of filas.slice(inicio)) {
+        if (fila.cells.length <= indice) continue;
+        const texto = fila.cells[indice].textContent.trim();
+        if (texto && !valores.includes(texto)) valores.push(texto);
+    }
+    return { columna: true, valores };
+}
+"""
+
+
+class ColumnaReinfo(TypedDict):
+    columna: bool
+    valores: List[str]
+
+
+async def extraer_actividades_sunat(page) -> List[str]:
+    """
+    Devuelve las actividades económicas (principal y secundarias) de la ficha RUC.
+    """
+    return await page.evaluate(JS_ACTIVIDADES_SUNAT)
+
+
+def normalizar_codigos_reinfo(valores: List[str]) -> List[str]:
+    """
+    Lleva los códigos al formato que siempre tuvo 'Código Único' (el de pd.read_html):
+    si todos son numéricos se quitan los ceros a la izquierda ("010149108" -> "10149108").
+    Así siguen coincidiendo con CODIGOS_REINFO_INVALIDOS y con los historiales guardados.
+    """
+    if not valores or not all(PATRON_CODIGO_NUMERICO.fullmatch(v) for v in valores):
+        return valores
+    return list(dict.fromkeys(str(int(v)) for v in valores))
+
+
+async def extraer_codigos_reinfo(page) -> Optional[ColumnaReinfo]:
+    """
+    Devuelve los 'Código Único' de la tabla de REINFO, o None si la tabla no está.
+    """
+    tabla = await page.evaluate(JS_COLUMNA_REINFO, COLUMNA_CODIGO_UNICO)
+    if tabla:
+        tabla["valores"] = normalizar_codigos_reinfo(tabla["valores"])
+    return tabla
@@ -0,0 +1,210 @@
+# src/modules/search/utils/historial_cargas.py
+import os
+import re
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from modules.search.utils.extraccion import RESULTADOS_ERROR_REINFO
+from modules.search.utils.normalizacion_ruc import normalizar_columna_ruc
+from modules.shared.utils.get_local_datetime import get_local_datetime
+
+BASE_DIR = Path(__file__).resolve().parents[4]  # project-myra-backend
+CARPETA_CARGAS = BASE_DIR / "data" / "cargas"
+
+# Columnas que se guardan de cada carga para poder reutilizarlas después
+COLUMNAS_RESULTADO = ["actividad_economica", "alerta", "Código Único"]
+COLUMNA_FECHA = "consultado_en"
+CLAVE = ["ruc", "nombre_del_minero"]
+
+
+def _ruta_cliente(cliente: str) -> Path:
+    nombre_seguro = re.sub(r"[^A-Za-z0-9_-]", "_", cliente.strip())
+    ruta = CARPETA_CARGAS / f"{nombre_seguro}.jsonl"
+    _migrar_formato_anterior(ruta)
+    return ruta
+
+
+def _ruta_temporal(cliente: str, job_id: str) -> Path:
+    # Una por trabajo: dos cargas por bloques del mismo cliente no deben mezclar sus filas
+    ruta = _ruta_cliente(cliente)
+    return ruta.with_name(f"{ruta.stem}.{job_id}.jsonl.tmp")
+
+
+def _migrar_formato_anterior(ruta: Path) -> None:
+    """
+    Las cargas se guardaban como un arreglo JSON en {cliente}.json; se pasan una sola vez
+    a JSON Lines para que el historial previo no se pierda.
+    """
+    anterior = ruta.with_suffix(".json")
+    if ruta.exists() or not anterior.exists():
+        return
+
+    df_anterior = pd.read_json(anterior, orient="records", dtype=False)
+    temporal = ruta.with_suffix(".jsonl.tmp")
+    df_anterior.to_json(temporal, orient="records", lines=True, date_format="iso", force_ascii=False)
+    os.replace(temporal, ruta)
+    anterior.unlink()
+    print(f"♻️ Historial {anterior.name} migrado a {ruta.name} ({len(df_anterior)} filas)")
+
+
+def _claves(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Devuelve un DataFrame con la clave (ruc normalizado, nombre_del_minero) de cada fila.
+    """
+    nombres = df["nombre_del_minero"] if "nombre_del_minero" in df.columns else pd.Series("", index=df.index)
+    return pd.DataFrame({
+        "ruc": normalizar_columna_ruc(df["ruc"]),
+        "nombre_del_minero": nombres.fillna("").astype(str).str.strip(),
+    }, index=df.index)
+
+
+def _con_error(df: pd.DataFrame) -> pd.Series:
+    """
+    Filas cuya consulta a SUNAT o REINFO falló: no se reutilizan aunque sean recientes
+    (la misma regla que usa la caché de consultas).
+    """
+    return df["actividad_economica"].eq("Error") | df["Código Único"].isin(RESULTADOS_ERROR_REINFO)
+
+
+def cargar_ultima_carga(cliente: str) -> Optional[pd.DataFrame]:
+    """
+    Lee la última carga guardada del cliente. Devuelve None si no existe.
+    """
+    ruta = _ruta_cliente(cliente)
+    if not ruta.exists():
+        print(f"⚠️ No hay cargas previas para el cliente '{cliente}'.")
+        return None
+
+    df_previa = pd.read_json(ruta, orient="records", lines=True, dtype=False)
+    df_previa[COLUMNA_FECHA] = pd.to_datetime(df_previa[COLUMNA_FECHA], utc=True)
+    print(f"✅ Carga previa de '{cliente}' leída ({len(df_previa)} filas)")
+    return df_previa
+
+
+def cargar_vigentes(
+    cliente: str,
+    df: pd.DataFrame,
+    max_antiguedad_horas: float,
+    filas_por_lectura: int = 5000,
+) -> Optional[pd.DataFrame]:
+    """
+    Lee del historial del cliente solo las filas vigentes cuya clave aparece en `df`,
+    recorriendo el archivo por partes: la memoria depende de `df`, no del historial.
+    """
+    ruta = _ruta_cliente(cliente)
+    if not ruta.exists():
+        return None
+
+    claves = pd.MultiIndex.from_frame(_claves(df).astype(str))
+    limite = pd.Timestamp(get_local_datetime() - timedelta(hours=max_antiguedad_horas)).tz_convert("UTC")
+
+    partes = []
+    with pd.read_json(ruta, orient="records", lines=True, dtype=False, chunksize=filas_por_lectura) as lector:
+        for parte in lector:
+            parte[COLUMNA_FECHA] = pd.to_datetime(parte[COLUMNA_FECHA], utc=True)
+            parte = parte[(parte[COLUMNA_FECHA] >= limite) & ~_con_error(parte)]
+            en_df = pd.MultiIndex.from_frame(parte[CLAVE].fillna("").astype(str)).isin(claves)
+            if en_df.any():
+                partes.append(parte[en_df])
+
+    return pd.concat(partes, ignore_index=True) if partes else None
+
+
+def guardar_carga(
+    cliente: str,
+    df: pd.DataFrame,
+    anexar: bool = False,
+    job_id: Optional[str] = None,
+) -> Path:
+    """
+    Guarda la clave y los resultados de cada fila para la próxima revalidación.
+    Con anexar=True agrega las filas al final (para guardar una carga por bloques).
+    Con job_id escribe en un archivo temporal de ese trabajo y el historial anterior sigue
+    intacto hasta confirmar_carga_temporal (el historial se sigue leyendo mientras se procesa la carga).
+    """
+    temporal = job_id is not None
+    ruta = _ruta_temporal(cliente, job_id) if temporal else _ruta_cliente(cliente)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+
+    df_guardar = _claves(df)
+    for col in [*COLUMNAS_RESULTADO, COLUMNA_FECHA]:
+        df_guardar[col] = df[col].values
+    df_guardar[COLUMNA_FECHA] = pd.to_datetime(df_guardar[COLUMNA_FECHA], utc=True)
+    df_guardar = df_guardar.drop_duplicates(subset=CLAVE, keep="last")
+
+    df_guardar.to_json(
+        ruta, orient="records", lines=True, date_format="iso", force_ascii=False,
+        mode="a" if anexar else "w",
+    )
+    if not anexar and not temporal:
+        print(f"✅ Carga de '{cliente}' guardada en: {ruta}")
+    return ruta
+
+
+def confirmar_carga_temporal(cliente: str, job_id: str) -> None:
+    temporal = _ruta_temporal(cliente, job_id)
+    if temporal.exists():
+        os.replace(temporal, _ruta_cliente(cliente))
+        print(f"✅ Carga de '{cliente}' guardada en: {_ruta_cliente(cliente)}")
+
+
+def descartar_carga_temporal(cliente: str, job_id: str) -> None:
+    _ruta_temporal(cliente, job_id).unlink(missing_ok=True)
+
+
+def rucs_cargados_recientemente(dias: int) -> List[str]:
+    """
+    RUCs de las cargas guardadas en los últimos `dias`, de la carga más reciente a la más antigua.
+    """
+    if not CARPETA_CARGAS.exists():
+        return []
+
+    for anterior in CARPETA_CARGAS.glob("*.json"):
+        _migrar_formato_anterior(anterior.with_suffix(".jsonl"))
+
+    limite = time.time() - dias * 86400
+    rutas = [r for r in CARPETA_CARGAS.glob("*.jsonl") if r.stat().st_mtime >= limite]
+    rutas.sort(key=lambda r: r.stat().st_mtime, reverse=True)
+
+    rucs: List[str] = []
+    for ruta in rutas:
+        df = pd.read_json(ruta, orient="records", lines=True, dtype=False)
+        if "ruc" in df.columns:
+            rucs.extend(normalizar_columna_ruc(df["ruc"]).dropna().tolist())
+    return list(dict.fromkeys(rucs))
+
+
+def separar_filas_vigentes(
+    df: pd.DataFrame,
+    df_previa: Optional[pd.DataFrame],
+    max_antiguedad_horas: float,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Separa la carga nueva en filas cuyos resultados previos siguen vigentes
+    (se reutilizan) y filas que deben consultarse de nuevo.
+
+    Retorna (df_reutilizado, df_pendiente). Ambos conservan el índice original
+    de `df`; df_reutilizado ya trae las columnas de resultado y 'consultado_en'.
+    """
+    if df_previa is None or df_previa.empty:
+        return df.iloc[0:0], df
+
+    limite = pd.Timestamp(get_local_datetime() - timedelta(hours=max_antiguedad_horas)).tz_convert("UTC")
+    vigentes = df_previa[(df_previa[COLUMNA_FECHA] >= limite) & ~_con_error(df_previa)]
+    vigentes = vigentes.drop_duplicates(subset=CLAVE, keep="last")
+
+    claves = _claves(df)
+    cruce = claves.reset_index().merge(vigentes, on=CLAVE, how="left").set_index("index")
+    reutilizable = cruce[COLUMNA_FECHA].notna()
+
+    df_reutilizado = df[reutilizable].copy()
+    for col in [*COLUMNAS_RESULTADO, COLUMNA_FECHA]:
+        df_reutilizado[col] = cruce.loc[reutilizable, col]
+    df_pendiente = df[~reutilizable]
+
+    print(f"♻️ {len(df_reutilizado)} filas reutilizadas, {len(df_pendiente)} filas por consultar")
+    return df_reutilizado, df_pendiente
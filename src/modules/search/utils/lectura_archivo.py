@@ -0,0 +1,163 @@
+# src/modules/search/utils/lectura_archivo.py
+import codecs
+import csv
+import importlib.util
+from pathlib import Path
+from typing import Iterator, Optional
+
+import openpyxl
+import pandas as pd
+
+from modules.search.utils.normalizacion_ruc import normalizar_columna_ruc
+
+COLUMNAS_REQUERIDAS = ["ruc", "nombre_del_minero"]
+EXTENSIONES_EXCEL = (".xlsx", ".xls")
+EXTENSIONES_CSV = (".csv",)
+EXTENSIONES_PERMITIDAS = (*EXTENSIONES_EXCEL, *EXTENSIONES_CSV)
+
+
+class ArchivoInvalidoError(ValueError):
+    """El archivo subido no tiene el formato o las columnas esperadas."""
+
+
+def _motor_excel(ruta: Path) -> Optional[str]:
+    """
+    Usa calamine (lector en Rust, mucho más rápido) si está instalado; si no,
+    openpyxl en modo solo lectura para .xlsx y el motor por defecto para .xls.
+    """
+    if importlib.util.find_spec("python_calamine") is not None:
+        return "calamine"
+    return "openpyxl" if ruta.suffix.lower() == ".xlsx" else None
+
+
+def _es_requerida(columna) -> bool:
+    return str(columna).strip().lower() in COLUMNAS_REQUERIDAS
+
+
+def _codificacion_csv(ruta: Path) -> str:
+    """
+    UTF-8 si todo el archivo lo es; si no, cp1252, que es como Excel en español guarda
+    "CSV (delimitado por comas)" (p. ej. "MUÑOZ").
+    """
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    with open(ruta, "rb") as f:
+        try:
+            while bloque := f.read(1024 * 1024):
+                decodificador.decode(bloque)
+            decodificador.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return "cp1252"
+    return "utf-8-sig"
+
+
+def _separador_csv(ruta: Path, codificacion: str) -> str:
+    """
+    Detecta el separador con la primera línea (Excel en español exporta con ';').
+    """
+    with open(ruta, encoding=codificacion, errors="replace") as f:
+        primera_linea = f.readline()
+    try:
+        return csv.Sniffer().sniff(primera_linea, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+
+def _leer(ruta: Path, **kwargs) -> pd.DataFrame:
+    if ruta.suffix.lower() in EXTENSIONES_CSV:
+        codificacion = _codificacion_csv(ruta)
+        # Los pocos bytes sin carácter en cp1252 se reemplazan en vez de cortar la carga
+        return pd.read_csv(
+            ruta, sep=_separador_csv(ruta, codificacion), encoding=codificacion,
+            encoding_errors="replace", **kwargs,
+        )
+    return pd.read_excel(ruta, engine=_motor_excel(ruta), **kwargs)
+
+
+def validar_encabezado(ruta: Path) -> None:
+    """
+    Lee solo la fila de encabezados y verifica que estén las columnas requeridas.
+    """
+    columnas = {str(c).strip().lower() for c in _leer(ruta, nrows=0).columns}
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in columnas]
+    if faltantes:
+        raise ArchivoInvalidoError(f"Faltan columnas requeridas: {', '.join(faltantes)}")
+
+
+def _validar_archivo(ruta) -> Path:
+    ruta = Path(ruta)
+    if ruta.suffix.lower() not in EXTENSIONES_PERMITIDAS:
+        raise ArchivoInvalidoError("El archivo debe ser un Excel (.xlsx o .xls) o un CSV (.csv)")
+
+    validar_encabezado(ruta)
+    return ruta
+
+
+def _limpiar(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    df = df.reindex(columns=COLUMNAS_REQUERIDAS)
+
+    df["ruc"] = normalizar_columna_ruc(df["ruc"])
+    df["nombre_del_minero"] = df["nombre_del_minero"].str.strip()
+    return df
+
+
+def leer_carga(ruta) -> pd.DataFrame:
+    """
+    Lee un Excel o CSV de carga con solo las columnas requeridas, todas como texto.
+    """
+    ruta = _validar_archivo(ruta)
+    df = _limpiar(_leer(ruta, usecols=_es_requerida, dtype=str))
+
+    print(f"✅ Archivo leído: {len(df)} filas ({ruta.suffix.lower()})")
+    return df
+
+
+def _bloques_xlsx(ruta: Path, filas_por_bloque: int) -> Iterator[pd.DataFrame]:
+    """
+    Recorre la primera hoja en streaming (openpyxl read_only) sin cargar todo el libro.
+    """
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = next(filas, ())
+        indices = [i for i, c in enumerate(encabezado) if _es_requerida(c)]
+        columnas = [encabezado[i] for i in indices]
+
+        bloque = []
+        for fila in filas:
+            bloque.append([None if i >= len(fila) or fila[i] is None else str(fila[i]) for i in indices])
+            if len(bloque) == filas_por_bloque:
+                yield pd.DataFrame(bloque, columns=columnas, dtype=object)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=columnas, dtype=object)
+    finally:
+        libro.close()
+
+
+def leer_carga_por_bloques(ruta, filas_por_bloque: int) -> Iterator[pd.DataFrame]:
+    """
+    Igual que leer_carga, pero entrega la carga en bloques de `filas_por_bloque`
+    filas para que la memoria dependa del bloque y no del archivo completo.
+    El índice de cada bloque continúa el del anterior.
+    """
+    ruta = _validar_archivo(ruta)
+    extension = ruta.suffix.lower()
+
+    if extension in EXTENSIONES_CSV:
+        bloques = _leer(ruta, usecols=_es_requerida, dtype=str, chunksize=filas_por_bloque)
+    elif extension == ".xlsx":
+        bloques = _bloques_xlsx(ruta, filas_por_bloque)
+    else:
+        # .xls no admite lectura en streaming: se lee completo y se parte
+        df = _leer(ruta, usecols=_es_requerida, dtype=str)
+        bloques = (df.iloc[i:i + filas_por_bloque] for i in range(0, len(df), filas_por_bloque))
+
+    inicio = 0
+    for bloque in bloques:
+        bloque = _limpiar(bloque)
+        bloque.index = pd.RangeIndex(inicio, inicio + len(bloque))
+        inicio += len(bloque)
+        yield bloque
+
+    print(f"✅ Archivo leído por bloques: {inicio} filas ({extension})")
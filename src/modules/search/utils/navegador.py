@@ -0,0 +1,118 @@
+# src/modules/search/utils/navegador.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import BrowserContext, Page, Route
+
+logger = logging.getLogger(__name__)
+
+ARGS_CHROMIUM = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--single-process',
+    '--memory-pressure-off',
+    '--disable-extensions',
+    '--disable-plugins',
+    '--disable-images',
+    '--disable-javascript-harmony-shipping',
+    '--max_old_space_size=4096'
+]
+
+# Política común de bloqueo para SUNAT y REINFO: solo se necesitan HTML, scripts y XHR
+TIPOS_BLOQUEADOS = {"image", "imageset", "stylesheet", "font", "media", "texttrack", "object", "beacon", "csp_report"}
+DOMINIOS_BLOQUEADOS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+)
+
+
+async def _filtrar_recurso(route: Route):
+    request = route.request
+    if request.resource_type in TIPOS_BLOQUEADOS or any(d in request.url for d in DOMINIOS_BLOQUEADOS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def aplicar_bloqueo_recursos(context: BrowserContext):
+    """
+    Bloquea imágenes, CSS, fuentes y analítica en todas las páginas del contexto.
+    """
+    await context.route("**/*", _filtrar_recurso)
+
+
+class PoolPaginas:
+    """
+    Mantiene páginas abiertas ("calientes") para reutilizarlas entre consultas
+    en lugar de abrir y navegar una página nueva cada vez.
+    """
+
+    def __init__(self, context: BrowserContext, maximo: int, preparar: Callable[[Page], Awaitable[None]]):
+        self.context = context
+        self.maximo = maximo
+        self.preparar = preparar
+        self.libres: asyncio.Queue = asyncio.Queue()
+        # Un cupo por página en uso: descartar una página rota también libera su cupo
+        self.cupos = asyncio.Semaphore(maximo)
+
+    async def adquirir(self) -> Page:
+        await self.cupos.acquire()
+        try:
+            if not self.libres.empty():
+                return self.libres.get_nowait()
+            return await self.context.new_page()
+        except BaseException:
+            self.cupos.release()
+            raise
+
+    def hay_libre(self) -> bool:
+        return not self.cupos.locked()
+
+    async def liberar(self, page: Page, sana: bool = True):
+        try:
+            if sana and not page.is_closed():
+                self.libres.put_nowait(page)
+                return
+            # Una página con error se descarta; la próxima consulta abrirá otra
+            try:
+                await page.close()
+            except Exception:
+                pass
+        finally:
+            self.cupos.release()
+
+    @asynccontextmanager
+    async def pagina(self):
+        """
+        Entrega una página ya ubicada en el formulario de búsqueda.
+        """
+        page = await self.adquirir()
+        sana = False
+        try:
+            await self.preparar(page)
+            yield page
+            sana = True
+        finally:
+            await self.liberar(page, sana)
+
+    async def cerrar(self):
+        while not self.libres.empty():
+            page: Optional[Page] = self.libres.get_nowait()
+            try:
+                await page.close()
+            except Exception:
+                pass
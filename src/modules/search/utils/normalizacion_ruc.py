@@ -0,0 +1,70 @@
+# src/modules/search/utils/normalizacion_ruc.py
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Prefijos válidos: 10 persona natural, 15/16/17 casos especiales, 20 persona jurídica
+PATRON_RUC = r"(?:10|15|16|17|20)\d{9}"
+PESOS_RUC = np.array([5, 4, 3, 2, 7, 6, 5, 4, 3, 2])
+
+
+def normalizar_ruc(valor) -> str:
+    """
+    Convierte un RUC leído de Excel (int, float o texto) a su forma de texto limpia.
+    """
+    texto = str(valor).strip()
+    try:
+        return str(int(float(texto)))
+    except (TypeError, ValueError):
+        return texto
+
+
+def ruc_es_valido(ruc: str) -> bool:
+    """
+    Verifica formato de 11 dígitos, prefijo y dígito verificador (módulo 11 de SUNAT).
+    """
+    return bool(validar_columna_ruc(pd.Series([ruc], dtype="string")).iloc[0])
+
+
+def normalizar_columna_ruc(serie: pd.Series) -> pd.Series:
+    """
+    Versión vectorizada de normalizar_ruc: quita espacios y el '.0' de las celdas numéricas.
+    """
+    return (
+        serie.astype("string")
+        .str.strip()
+        .str.replace(r"\.0+$", "", regex=True)
+    )
+
+
+def validar_columna_ruc(serie: pd.Series) -> pd.Series:
+    """
+    Devuelve una máscara booleana con los RUCs válidos de una columna ya normalizada.
+    """
+    forma = serie.str.fullmatch(PATRON_RUC).fillna(False).astype(bool)
+    validos = pd.Series(False, index=serie.index)
+    if not forma.any():
+        return validos
+
+    # Matriz (n, 11) con los dígitos de cada RUC bien formado
+    digitos = np.frombuffer("".join(serie[forma]).encode("ascii"), dtype=np.uint8).reshape(-1, 11) - ord("0")
+    verificador = (11 - (digitos[:, :10] @ PESOS_RUC) % 11) % 10
+    validos[forma] = verificador == digitos[:, 10]
+    return validos
+
+
+def preparar_rucs(df: pd.DataFrame, columna_ruc: str = "ruc") -> Tuple[pd.Series, List[str]]:
+    """
+    Valida la columna de RUCs una sola vez y arma el conjunto de RUCs únicos a consultar.
+
+    Retorna (mascara_validos, rucs_unicos). Los inválidos no se consultan en ningún sitio.
+    """
+    validos = validar_columna_ruc(df[columna_ruc])
+    rucs_unicos = df.loc[validos, columna_ruc].drop_duplicates().tolist()
+
+    invalidos = int((~validos).sum())
+    if invalidos:
+        print(f"⚠️ {invalidos} filas con RUC inválido no se consultarán")
+    print(f"✅ {len(rucs_unicos)} RUCs únicos por consultar ({len(df)} filas)")
+    return validos, rucs_unicos
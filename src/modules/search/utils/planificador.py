@@ -0,0 +1,164 @@
+# src/modules/search/utils/planificador.py
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORIDADES = {"baja": 0, "normal": 1, "alta": 2}
+
+
+@dataclass(frozen=True)
+class Trabajo:
+    id: str
+    prioridad: int = PRIORIDADES["normal"]
+    peso: float = 1.0
+
+
+_trabajo_actual: ContextVar[Trabajo] = ContextVar("trabajo_actual", default=Trabajo("anonimo"))
+
+
+def trabajo_actual() -> Trabajo:
+    return _trabajo_actual.get()
+
+
+@contextmanager
+def en_trabajo(job_id: str, prioridad: int = PRIORIDADES["normal"], peso: float = 1.0):
+    """
+    Marca las consultas hechas dentro del bloque (y de las tareas que cree) como parte del trabajo.
+    """
+    token = _trabajo_actual.set(Trabajo(job_id, prioridad, peso))
+    try:
+        yield
+    finally:
+        _trabajo_actual.reset(token)
+
+
+class Planificador:
+    """
+    Reparte la capacidad de un sitio externo entre todos los trabajos del proceso.
+
+    - La capacidad (consultas simultáneas) es global, no por trabajo.
+    - Entre prioridades se atiende siempre primero la más alta.
+    - Dentro de una prioridad se usa encolado justo ponderado (start-time fair queuing):
+      cada trabajo avanza a un ritmo proporcional a su peso, así una carga de 5 filas
+      no espera a que termine otra de 5.000.
+    """
+
+    def __init__(self, nombre: str, capacidad: int):
+        self.nombre = nombre
+        self.capacidad = capacidad
+        self.ocupados = 0
+        self.tiempo_virtual = 0.0
+        # La cola puede tener entradas viejas de esperas promovidas o canceladas (futuro ya resuelto):
+        # `esperando` cuenta solo las esperas vivas
+        self.cola: List[Tuple[int, float, int, asyncio.Future]] = []
+        self.esperando = 0
+        self.en_espera: Dict[Hashable, Tuple[int, float, asyncio.Future]] = {}
+        self.fin_por_trabajo: Dict[str, float] = {}
+        self._secuencia = itertools.count()
+
+    def _inicio(self, trabajo: Trabajo) -> float:
+        return max(self.tiempo_virtual, self.fin_por_trabajo.get(trabajo.id, 0.0))
+
+    def _etiqueta(self, trabajo: Trabajo) -> float:
+        inicio = self._inicio(trabajo)
+        self.fin_por_trabajo[trabajo.id] = inicio + 1.0 / trabajo.peso
+        return inicio
+
+    async def adquirir(self, trabajo: Trabajo, clave: Optional[Hashable] = None) -> None:
+        """
+        Espera un cupo. Con `clave` la espera queda registrada para que otros trabajos
+        que se unan a la misma consulta puedan adelantarla (ver `promover`).
+        """
+        etiqueta = self._etiqueta(trabajo)
+
+        if self.ocupados < self.capacidad and not self.esperando:
+            self.ocupados += 1
+            self.tiempo_virtual = max(self.tiempo_virtual, etiqueta)
+            return
+
+        futuro = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.cola, (-trabajo.prioridad, etiqueta, next(self._secuencia), futuro))
+        self.esperando += 1
+        if clave is not None:
+            self.en_espera[clave] = (-trabajo.prioridad, etiqueta, futuro)
+        try:
+            await futuro
+        except asyncio.CancelledError:
+            # Si el cupo ya se había asignado, se devuelve para el siguiente en la cola
+            if futuro.done() and not futuro.cancelled():
+                self.liberar()
+            else:
+                futuro.cancel()
+                self.esperando -= 1
+            raise
+        finally:
+            if clave is not None and self.en_espera.get(clave, (None, None, None))[2] is futuro:
+                del self.en_espera[clave]
+
+    def promover(self, clave: Hashable, trabajo: Trabajo) -> bool:
+        """
+        Otro trabajo se une a una consulta que todavía espera cupo: la espera pasa a
+        la prioridad y el turno más favorables entre el suyo y el de ese trabajo.
+        Así una carga chica no hereda el lugar en la cola de una grande.
+        """
+        espera = self.en_espera.get(clave)
+        if espera is None or espera[2].done():
+            return False
+
+        prioridad, etiqueta, futuro = espera
+        nueva = (-trabajo.prioridad, self._inicio(trabajo))
+        if nueva >= (prioridad, etiqueta):
+            return False
+
+        self._etiqueta(trabajo)
+        heapq.heappush(self.cola, (*nueva, next(self._secuencia), futuro))
+        self.en_espera[clave] = (*nueva, futuro)
+        return True
+
+    def intentar_adquirir(self) -> bool:
+        """
+        Toma un cupo solo si hay uno libre y nadie esperando; nunca espera.
+        """
+        if self.ocupados < self.capacidad and not self.esperando:
+            self.ocupados += 1
+            return True
+        return False
+
+    def liberar(self) -> None:
+        while self.cola:
+            _, etiqueta, _, futuro = heapq.heappop(self.cola)
+            if futuro.done():
+                continue  # espera cancelada o ya atendida por una entrada promovida
+            # El cupo pasa directamente al siguiente: `ocupados` no cambia
+            self.esperando -= 1
+            self.tiempo_virtual = max(self.tiempo_virtual, etiqueta)
+            futuro.set_result(None)
+            return
+
+        self.ocupados -= 1
+        self._podar()
+
+    def _podar(self) -> None:
+        # Los trabajos cuya última etiqueta ya quedó atrás no necesitan recordarse
+        if len(self.fin_por_trabajo) > 1000:
+            self.fin_por_trabajo = {
+                job_id: fin for job_id, fin in self.fin_por_trabajo.items() if fin > self.tiempo_virtual
+            }
+
+    @asynccontextmanager
+    async def cupo(self, trabajo: Optional[Trabajo] = None):
+        await self.adquirir(trabajo or trabajo_actual())
+        try:
+            yield
+        finally:
+            self.liberar()
+
+    def estado(self) -> Dict[str, int]:
+        return {"capacidad": self.capacidad, "ocupados": self.ocupados, "en_cola": self.esperando}
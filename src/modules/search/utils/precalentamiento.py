@@ -0,0 +1,142 @@
+# src/modules/search/utils/precalentamiento.py
+import asyncio
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+from settings import Settings
+from modules.search.utils.consulta_unificada import (
+    PLANIFICADORES,
+    antiguedad_en_cache,
+    obtener_registros_recpo,
+    refrescar,
+    rucs_recientes,
+)
+from modules.search.utils.historial_cargas import rucs_cargados_recientemente
+from modules.search.utils.normalizacion_ruc import validar_columna_ruc
+from modules.search.utils.planificador import PRIORIDADES, en_trabajo
+from modules.shared.utils.get_local_datetime import get_local_datetime
+
+logger = logging.getLogger(__name__)
+
+JOB_ID = "precalentamiento"
+# Tras tantas fallas seguidas contra un sitio se deja de insistir hasta la próxima pasada
+MAX_FALLAS_SEGUIDAS = 5
+
+_tarea: Optional[asyncio.Task] = None
+
+
+def en_horario(hora: int, horario: str) -> bool:
+    """
+    Indica si la hora (0-23) cae en el horario "inicio-fin"; "0-24" es todo el día.
+    """
+    inicio, fin = (int(h) for h in horario.split("-"))
+    if inicio <= fin:
+        return inicio <= hora < fin
+    return hora >= inicio or hora < fin
+
+
+def rucs_a_precalentar() -> List[str]:
+    """
+    Primero los RUCs de las cargas recientes (en memoria y en el historial),
+    luego los comercializadores del RECPO; sin repetidos y hasta PRECALENTAMIENTO_MAX_RUCS.
+    """
+    candidatos = [
+        *rucs_recientes(),
+        *rucs_cargados_recientemente(Settings.PRECALENTAMIENTO_HISTORIAL_DIAS),
+        *obtener_registros_recpo().keys(),
+    ]
+    rucs = pd.Series(list(dict.fromkeys(candidatos)), dtype="string")
+    return rucs[validar_columna_ruc(rucs)].head(Settings.PRECALENTAMIENTO_MAX_RUCS).tolist()
+
+
+def necesita_refresco(fuente: str, ruc: str) -> bool:
+    antiguedad = antiguedad_en_cache(fuente, ruc)
+    return antiguedad is None or antiguedad >= Settings.PRECALENTAMIENTO_UMBRAL * Settings.CACHE_CONSULTAS_TTL_SEGUNDOS
+
+
+async def esperar_capacidad_libre(fuente: str) -> None:
+    """
+    Espera a que el sitio tenga cupos libres y nadie en cola: el precalentamiento
+    solo usa la capacidad que las cargas y consultas de los usuarios no están usando.
+    """
+    planificador = PLANIFICADORES[fuente]
+    while planificador.esperando or planificador.ocupados >= planificador.capacidad:
+        await asyncio.sleep(Settings.PRECALENTAMIENTO_PAUSA_SEGUNDOS)
+
+
+async def precalentar_fuente(fuente: str, rucs: List[str]) -> int:
+    """
+    Refresca en la caché los resultados de `fuente` que vencen pronto, de a uno y con pausas.
+    Devuelve la cantidad de RUCs refrescados.
+    """
+    refrescados = 0
+    fallas_seguidas = 0
+
+    for ruc in rucs:
+        if not en_horario(get_local_datetime().hour, Settings.PRECALENTAMIENTO_HORARIO):
+            break
+        if not necesita_refresco(fuente, ruc):
+            continue
+
+        await esperar_capacidad_libre(fuente)
+        if await refrescar(fuente, ruc):
+            refrescados += 1
+            fallas_seguidas = 0
+        else:
+            fallas_seguidas += 1
+            if fallas_seguidas >= MAX_FALLAS_SEGUIDAS:
+                logger.warning(f"⚠️ Precalentamiento {fuente}: {fallas_seguidas} fallas seguidas, se pausa hasta la próxima pasada")
+                break
+        await asyncio.sleep(Settings.PRECALENTAMIENTO_PAUSA_SEGUNDOS)
+
+    return refrescados
+
+
+async def precalentar() -> None:
+    """
+    Una pasada del precalentamiento sobre SUNAT y REINFO (cada sitio con su propia capacidad).
+    """
+    rucs = await asyncio.to_thread(rucs_a_precalentar)
+    with en_trabajo(JOB_ID, PRIORIDADES["baja"]):
+        sunat, reinfo = await asyncio.gather(
+            precalentar_fuente("sunat", rucs),
+            precalentar_fuente("reinfo", rucs),
+        )
+    if sunat or reinfo:
+        logger.info(f"🔥 Precalentamiento: {sunat} RUCs refrescados en SUNAT y {reinfo} en REINFO ({len(rucs)} candidatos)")
+
+
+async def _bucle() -> None:
+    while True:
+        if en_horario(get_local_datetime().hour, Settings.PRECALENTAMIENTO_HORARIO):
+            try:
+                await precalentar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error en el precalentamiento de la caché: {e}")
+        await asyncio.sleep(Settings.PRECALENTAMIENTO_INTERVALO_SEGUNDOS)
+
+
+def iniciar_precalentamiento() -> None:
+    global _tarea
+
+    if not Settings.PRECALENTAMIENTO_HABILITADO or _tarea is not None:
+        return
+    _tarea = asyncio.create_task(_bucle())
+    logger.info(f"🔥 Precalentamiento de la caché activo (horario {Settings.PRECALENTAMIENTO_HORARIO} h)")
+
+
+async def detener_precalentamiento() -> None:
+    global _tarea
+
+    if _tarea is None:
+        return
+    _tarea.cancel()
+    try:
+        await _tarea
+    except asyncio.CancelledError:
+        pass
+    _tarea = None
@@ -0,0 +1,116 @@
+# src/modules/search/utils/resultados.py
+import asyncio
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Optional, Set
+
+from settings import Settings
+
+BASE_DIR = Path(__file__).resolve().parents[4]  # project-myra-backend
+CARPETA_RESULTADOS = BASE_DIR / "data" / "resultados"
+PATRON_JOB_ID = re.compile(r"[0-9a-f]{32}")
+# Lista completa de alertas de las cargas por bloques (JSON Lines)
+NOMBRE_ALERTAS = "alertas.jsonl"
+
+# Trabajos cuyos archivos todavía se están escribiendo, con los formatos que generan
+_en_progreso: Dict[str, Set[str]] = {}
+
+
+class TrabajoExistenteError(Exception):
+    """El job_id ya pertenece a otro trabajo (en curso o con resultados guardados)."""
+
+
+def nuevo_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def job_id_valido(job_id: str) -> bool:
+    return bool(PATRON_JOB_ID.fullmatch(job_id or ""))
+
+
+def carpeta_trabajo(job_id: str) -> Path:
+    """
+    Carpeta privada del trabajo (fuera de public/, no se sirve como estático).
+    """
+    if not job_id_valido(job_id):
+        raise ValueError(f"job_id inválido: {job_id}")
+    return CARPETA_RESULTADOS / job_id
+
+
+def ruta_resultado(job_id: str, nombre_base: str, formato: str) -> Optional[Path]:
+    if not job_id_valido(job_id):
+        return None
+    return carpeta_trabajo(job_id) / f"{nombre_base}.{formato}"
+
+
+def iniciar_trabajo(job_id: str, formatos: Iterable[str] = ("xlsx",)) -> Path:
+    """
+    Reserva la carpeta del trabajo. Un job_id ya usado se rechaza para no escribir
+    sobre los archivos de otro trabajo.
+    """
+    limpiar_resultados_vencidos()
+    carpeta = carpeta_trabajo(job_id)
+    if job_id in _en_progreso:
+        raise TrabajoExistenteError(f"El trabajo {job_id} ya está en curso")
+    CARPETA_RESULTADOS.mkdir(parents=True, exist_ok=True)
+    try:
+        carpeta.mkdir()
+    except FileExistsError:
+        raise TrabajoExistenteError(f"El trabajo {job_id} ya existe")
+    _en_progreso[job_id] = set(formatos)
+    return carpeta
+
+
+def terminar_trabajo(job_id: str) -> None:
+    _en_progreso.pop(job_id, None)
+
+
+def trabajo_en_progreso(job_id: str) -> bool:
+    return job_id in _en_progreso
+
+
+def formatos_en_progreso(job_id: str) -> Set[str]:
+    """
+    Formatos que genera un trabajo en curso (vacío si el trabajo no está en curso).
+    """
+    return _en_progreso.get(job_id, set())
+
+
+def limpiar_resultados_vencidos() -> None:
+    """
+    Borra las carpetas de trabajos terminados hace más de RESULTADOS_TTL_HORAS.
+    """
+    if not CARPETA_RESULTADOS.exists():
+        return
+    limite = time.time() - Settings.RESULTADOS_TTL_HORAS * 3600
+    for carpeta in CARPETA_RESULTADOS.iterdir():
+        if carpeta.name in _en_progreso or not carpeta.is_dir():
+            continue
+        if carpeta.stat().st_mtime < limite:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+
+async def seguir_archivo(ruta: Path, job_id: str, tamano_bloque: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """
+    Entrega el archivo a medida que se escribe (como `tail -f`) hasta que el trabajo termina.
+    """
+    while not ruta.exists():
+        if not trabajo_en_progreso(job_id):
+            return
+        await asyncio.sleep(0.5)
+
+    with open(ruta, "rb") as f:
+        while True:
+            datos = f.read(tamano_bloque)
+            if datos:
+                yield datos
+                continue
+            if not trabajo_en_progreso(job_id):
+                resto = f.read()
+                if resto:
+                    yield resto
+                return
+            await asyncio.sleep(0.5)
@@ -1,69 +1,103 @@
-from datetime import datetime
+import asyncio
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable, Optional
 import os
+import numpy as np
+import orjson
 import pandas as pd
 from dotenv import load_dotenv
-from modules.search.utils.consulta_ruc import procesar_df_rucs
-from modules.search.utils.consulta_reinfo import agregar_codigo_unico_al_df
+from settings import Settings
+from modules.search.utils.lectura_archivo import leer_carga, leer_carga_por_bloques
+from modules.search.utils.exportacion import EscritorIncremental, exportar_resultado
+from modules.search.utils.planificador import PRIORIDADES, en_trabajo, trabajo_actual
+from modules.search.utils.resultados import NOMBRE_ALERTAS, iniciar_trabajo, nuevo_job_id, terminar_trabajo
+from modules.search.utils.normalizacion_ruc import preparar_rucs
+from modules.search.utils.historial_cargas import (
+    cargar_ultima_carga,
+    cargar_vigentes,
+    confirmar_carga_temporal,
+    descartar_carga_temporal,
+    guardar_carga,
+    separar_filas_vigentes,
+)
+from modules.search.utils.consulta_unificada import (
+    CODIGOS_SIN_REINFO,
+    PATRON_ACTIVIDAD_MINERA,
+    SIN_RECPO,
+    consultar_fuentes,
+    obtener_registros_recpo,
+    obtener_scraper_reinfo,
+    obtener_scraper_sunat,
+)
+from modules.shared.utils.get_local_datetime import get_local_datetime
+from modules.shared.utils.tracing import span
 
 load_dotenv()  # Cargar variables de entorno si no se han cargado aún
 
-BASE_DIR = Path(__file__).resolve().parents[4]  # project-myra-backend
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:3000")
 
-async def validacion_total(excel_path):
-    df = pd.read_excel(excel_path)
+RUC_INVALIDO = "RUC inválido"
+NOMBRE_SALIDA = "veta_test_procesado"
+COLUMNAS_CATEGORICAS = ["actividad_economica", "alerta", "Código Único", "Registro RECPO"]
 
-    # Procesamiento de RUCs
-    df1 = await procesar_df_rucs(df, columna_ruc="ruc")
+async def consultar_filas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Consulta SUNAT y REINFO para las filas recibidas, conservando su índice original.
+    """
+    if df.empty:
+        return df.assign(**{"actividad_economica": [], "alerta": [], "Código Único": []})
 
-    # Validar si existe función correctamente
-    try:
-        test = pd.DataFrame({"ruc": ["10000000001"]})
-        await agregar_codigo_unico_al_df(test)
-        print("✅ Función agregar_codigo_unico_al_df disponible")
-    except KeyError:
-        print("⚠️ Las columnas 'actividad_economica' y 'alerta' no existen en el DataFrame.")
-    
-    df2 = await agregar_codigo_unico_al_df(df1)
-
-    # Preparar ruta del archivo RECPO del mes
-    nombre_archivo_recpo = f"recpo_{datetime.now().strftime('%Y-%m')}.xlsx"
-    ruta_archivo_recpo = Path(__file__).resolve().parent / nombre_archivo_recpo
-
-    # Leer archivo RECPO si existe
-    if ruta_archivo_recpo.exists():
-        df_recpo = pd.read_excel(ruta_archivo_recpo)
-        print("✅ recpo cargado correctamente")
-    else:
-        print(f"⚠️ El archivo '{ruta_archivo_recpo}' no existe.")
-        df_recpo = pd.DataFrame()
-
-    df_recpo["ruc"] = df_recpo["ruc"].astype(str)
-    df2["ruc"] = df2["ruc"].astype(str)
-    df3 = df2.merge(df_recpo[["ruc", "N° Registro"]], on="ruc", how="left")
-    df3 = df3.rename(columns={"N° Registro": "Registro RECPO"})
-    df3["Registro RECPO"] = df3["Registro RECPO"].fillna("⚠️ No tiene RECPO")
-
-    # Guardar Excel resultante en carpeta public del proyecto raíz
-    carpeta_salida = BASE_DIR / "public"
-    carpeta_salida.mkdir(parents=True, exist_ok=True)
-    ruta_excel_salida = carpeta_salida / "veta_test_procesado.xlsx"
-    df3.to_excel(ruta_excel_salida, index=False)
-    print(f"✅ Archivo guardado en: {ruta_excel_salida}")
-
-    # Convertir columnas clave a string
-    for col in ["actividad_economica", "Código Único", "Registro RECPO"]:
-        df3[col] = df3[col].astype(str)
+    # Validar y deduplicar: cada RUC distinto se consulta una sola vez por trabajo
+    with span("rucs.preparar", filas=len(df)) as s:
+        validos, rucs_unicos = preparar_rucs(df, columna_ruc="ruc")
+        s.set("rucs_unicos", len(rucs_unicos))
 
-    # Aplicar filtros de alerta
-    cond1 = ~df3["actividad_economica"].str.contains("MINERA|EXTRACCIÓN", case=False, na=False)
-    cond2 = df3["Código Único"].str.strip().isin(["No tiene REINFO", "Error"])
-    cond3 = df3["Registro RECPO"].str.contains("No tiene", case=False, na=False)
-    cond4 = df3["Código Único"].str.strip() == "Error"
+    if rucs_unicos:
+        # Iniciar los navegadores antes del lote
+        with span("navegadores.iniciar"):
+            await asyncio.gather(obtener_scraper_sunat(), obtener_scraper_reinfo())
+    df_resultados = await consultar_fuentes(rucs_unicos)
+
+    # Volcar los resultados sobre las filas originales en un solo cruce
+    with span("resultados.cruce"):
+        df2 = df.join(df_resultados, on="ruc")
+        df2.loc[~validos, ["actividad_economica", "Código Único"]] = RUC_INVALIDO
+        df2.loc[~validos, "alerta"] = f"⚠️ {RUC_INVALIDO}"
+    df2["consultado_en"] = pd.Timestamp(get_local_datetime())
+    return df2
+
+
+def agregar_recpo(df: pd.DataFrame) -> None:
+    """
+    Agrega la columna 'Registro RECPO' cruzando con el RECPO vigente.
+    """
+    with span("recpo.cargar"):
+        registros_recpo = obtener_registros_recpo()
+    with span("recpo.cruce", filas=len(df)):
+        df["Registro RECPO"] = df["ruc"].map(registros_recpo).fillna(SIN_RECPO)
+
+
+def compactar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Los textos de resultado se repiten mucho entre filas: como categoría ocupan una fracción.
+    """
+    return df.astype({col: "category" for col in COLUMNAS_CATEGORICAS if col in df.columns})
 
-    df_alertas = df3[cond1 | cond2 | cond3 | cond4].drop_duplicates(subset="ruc")
 
+def mascara_alertas(df: pd.DataFrame) -> pd.Series:
+    actividad = df["actividad_economica"].astype(str)
+    codigo = df["Código Único"].astype(str).str.strip()
+    recpo = df["Registro RECPO"].astype(str)
+
+    cond1 = ~actividad.str.contains(PATRON_ACTIVIDAD_MINERA, case=False, na=False)
+    cond2 = codigo.isin(CODIGOS_SIN_REINFO)
+    cond3 = recpo.str.contains("No tiene", case=False, na=False)
+    cond4 = codigo == "Error"
+    return cond1 | cond2 | cond3 | cond4
+
+
+def alertas_a_json(df_alertas: pd.DataFrame) -> list:
     df_alertas2 = df_alertas.rename(columns={
         "ruc": "ruc",
         "nombre_del_minero": "name",
@@ -72,12 +106,208 @@ async def validacion_total(excel_path):
         "Registro RECPO": "recpo"
     })
 
-    alertas_json = df_alertas2[["ruc", "name", "economicActivity", "uniqueCode", "recpo"]].to_dict(orient="records")
+    df_alertas2 = df_alertas2[["ruc", "name", "economicActivity", "uniqueCode", "recpo"]].astype(object)
+    for col in ["economicActivity", "uniqueCode", "recpo"]:
+        df_alertas2[col] = df_alertas2[col].astype(str)
+    return df_alertas2.where(df_alertas2.notna(), None).to_dict(orient="records")
+
+
+@dataclass
+class Alertas:
+    """
+    Alertas de un trabajo. En memoria van todas en `datos`; por bloques solo las primeras
+    ALERTAS_MAX_EN_RESPUESTA, y la lista completa queda en el archivo de alertas del trabajo.
+    """
+
+    datos: list = field(default_factory=list)
+    total: int = 0
+    en_archivo: bool = False
+
+    @property
+    def truncadas(self) -> bool:
+        return self.total > len(self.datos)
+
+
+class EscritorAlertas:
+    """
+    Acumula las alertas de una carga por bloques sin que la memoria crezca con el archivo:
+    se escriben a disco a medida que aparecen y los RUCs ya alertados se recuerdan como
+    hashes de 8 bytes en un arreglo ordenado.
+    """
+
+    def __init__(self, carpeta: Path, max_en_respuesta: int):
+        self.ruta = carpeta / NOMBRE_ALERTAS
+        self.max_en_respuesta = max_en_respuesta
+        self.alertas = Alertas(en_archivo=True)
+        self.rucs_con_alerta = np.empty(0, dtype=np.uint64)
+        self.archivo = open(self.ruta, "wb")
+
+    def agregar(self, df_alertas: pd.DataFrame) -> None:
+        # Las alertas se deduplican por RUC entre todos los bloques
+        hashes = pd.util.hash_pandas_object(df_alertas["ruc"].astype(str), index=False).to_numpy()
+        nuevas = ~np.isin(hashes, self.rucs_con_alerta)
+        df_alertas = df_alertas[nuevas]
+        self.rucs_con_alerta = np.union1d(self.rucs_con_alerta, hashes[nuevas])
+
+        for alerta in alertas_a_json(df_alertas):
+            self.archivo.write(orjson.dumps(alerta) + b"\n")
+            if len(self.alertas.datos) < self.max_en_respuesta:
+                self.alertas.datos.append(alerta)
+            self.alertas.total += 1
+
+    def cerrar(self) -> Alertas:
+        self.archivo.close()
+        return self.alertas
+
+
+def url_resultado(job_id: str, formato: str) -> str:
+    return f"{BACKEND_URL}/api/search/jobs/{job_id}/result/{formato}"
+
+
+def url_alertas(job_id: str) -> str:
+    return f"{BACKEND_URL}/api/search/jobs/{job_id}/alerts"
+
 
+def armar_resultado(job_id: str, alertas: Alertas, rutas_salida: dict):
+    ruta_excel_salida = rutas_salida["xlsx"]
     resultado = {
-        "data": alertas_json,
-        "url": f"{BACKEND_URL}/static/veta_test_procesado.xlsx"
+        "jobId": job_id,
+        "data": alertas.datos,
+        "alertsTotal": alertas.total,
+        "alertsTruncated": alertas.truncadas,
+        "alertsUrl": url_alertas(job_id) if alertas.en_archivo else None,
+        "url": url_resultado(job_id, "xlsx"),
+        "urls": {formato: url_resultado(job_id, formato) for formato in rutas_salida},
     }
 
     print("✅ JSON de alertas críticas generado correctamente")
     return resultado, str(ruta_excel_salida)
+
+
+async def validacion_total(
+    excel_path,
+    cliente: Optional[str] = None,
+    incremental: bool = False,
+    max_antiguedad_horas: Optional[float] = None,
+    formatos: Iterable[str] = ("xlsx",),
+    bajo_consumo: bool = False,
+    job_id: Optional[str] = None,
+    prioridad: int = PRIORIDADES["normal"],
+):
+    if max_antiguedad_horas is None:
+        max_antiguedad_horas = Settings.REVALIDACION_MAX_ANTIGUEDAD_HORAS
+
+    # Los archivos de cada trabajo van a su propia carpeta privada, servida por /jobs/{job_id}/result
+    job_id = job_id or nuevo_job_id()
+    carpeta_salida = iniciar_trabajo(job_id, ["xlsx", *formatos])
+    try:
+        # Todas las consultas del trabajo pasan por el planificador global con esta identidad
+        with en_trabajo(job_id, prioridad):
+            validar = validacion_por_bloques if bajo_consumo else validacion_en_memoria
+            alertas, rutas_salida = await validar(
+                excel_path, cliente, incremental, max_antiguedad_horas, formatos, carpeta_salida
+            )
+    finally:
+        terminar_trabajo(job_id)
+
+    return armar_resultado(job_id, alertas, rutas_salida)
+
+
+async def validacion_en_memoria(
+    excel_path,
+    cliente: Optional[str],
+    incremental: bool,
+    max_antiguedad_horas: float,
+    formatos: Iterable[str],
+    carpeta_salida: Path,
+):
+    with span("excel.leer") as s:
+        df = leer_carga(excel_path)
+        s.set("filas", len(df))
+
+    # En modo incremental solo se consultan los RUCs nuevos o con resultados vencidos
+    with span("historial.separar", incremental=incremental):
+        df_previa = cargar_ultima_carga(cliente) if incremental and cliente else None
+        df_reutilizado, df_pendiente = separar_filas_vigentes(df, df_previa, max_antiguedad_horas)
+
+    df_consultado = await consultar_filas(df_pendiente)
+    df3 = pd.concat([df_reutilizado, df_consultado]).sort_index()
+
+    if cliente:
+        with span("historial.guardar"):
+            guardar_carga(cliente, df3)
+    df3 = df3.drop(columns=["consultado_en"])
+
+    # Cruce con el RECPO vigente
+    agregar_recpo(df3)
+
+    # Guardar resultado (xlsx siempre, más los formatos pedidos)
+    with span("exportar", formatos=["xlsx", *formatos]):
+        rutas_salida = exportar_resultado(df3, carpeta_salida, NOMBRE_SALIDA, ["xlsx", *formatos])
+
+    # Aplicar filtros de alerta
+    with span("alertas"):
+        df_alertas = df3[mascara_alertas(df3)].drop_duplicates(subset="ruc")
+        alertas_json = alertas_a_json(df_alertas)
+    return Alertas(alertas_json, len(alertas_json)), rutas_salida
+
+
+async def validacion_por_bloques(
+    excel_path,
+    cliente: Optional[str],
+    incremental: bool,
+    max_antiguedad_horas: float,
+    formatos: Iterable[str],
+    carpeta_salida: Path,
+    filas_por_bloque: Optional[int] = None,
+):
+    """
+    Modo de bajo consumo: procesa la carga en bloques y escribe el resultado a medida
+    que avanza, de modo que la memoria dependa del tamaño del bloque y no del archivo.
+    """
+    filas_por_bloque = filas_por_bloque or Settings.BLOQUE_FILAS
+    job_id = trabajo_actual().id
+
+    escritor = EscritorIncremental(carpeta_salida, NOMBRE_SALIDA, ["xlsx", *formatos])
+    escritor_alertas = EscritorAlertas(carpeta_salida, Settings.ALERTAS_MAX_EN_RESPUESTA)
+    terminado = False
+
+    try:
+        for numero, bloque in enumerate(leer_carga_por_bloques(excel_path, filas_por_bloque)):
+            print(f"📦 Bloque {numero + 1}: filas {bloque.index[0]}-{bloque.index[-1]}")
+
+            with span("bloque", numero=numero + 1, filas=len(bloque)):
+                # Del historial solo se leen las filas de este bloque, no el historial completo
+                with span("historial.separar", incremental=incremental):
+                    df_previa = (
+                        cargar_vigentes(cliente, bloque, max_antiguedad_horas, filas_por_bloque)
+                        if incremental and cliente else None
+                    )
+                    df_reutilizado, df_pendiente = separar_filas_vigentes(bloque, df_previa, max_antiguedad_horas)
+                bloque = pd.concat([df_reutilizado, await consultar_filas(df_pendiente)]).sort_index()
+                del df_previa, df_reutilizado, df_pendiente
+
+                if cliente:
+                    # Aparte hasta terminar: los bloques siguientes todavía leen el historial anterior
+                    guardar_carga(cliente, bloque, anexar=numero > 0, job_id=job_id)
+                bloque = bloque.drop(columns=["consultado_en"])
+
+                agregar_recpo(bloque)
+                bloque = compactar(bloque)
+                with span("exportar"):
+                    escritor.escribir(bloque)
+
+                with span("alertas"):
+                    escritor_alertas.agregar(bloque[mascara_alertas(bloque)].drop_duplicates(subset="ruc"))
+        terminado = True
+    finally:
+        with span("exportar.cerrar"):
+            rutas_salida = escritor.cerrar()
+            alertas = escritor_alertas.cerrar()
+        if cliente:
+            if terminado:
+                confirmar_carga_temporal(cliente, job_id)
+            else:
+                descartar_carga_temporal(cliente, job_id)
+
+    return alertas, rutas_salida
@@ -192,10 +192,14 @@ class ErrorHandler:
         }
 
         if status_code in error_methods:
-            return error_methods[status_code](message)
+            response = error_methods[status_code](message)
+        else:
+            # Error por defecto si no hay método específico
+            response = ErrorHandler.e_default(exc)
 
-        # Error por defecto si no hay método específico
-        return ErrorHandler.e_default(exc)
+        # Headers propios de la excepción (p. ej. X-Trace-Id de un trabajo fallido)
+        response.headers.update(getattr(exc, 'headers', None) or {})
+        return response
 
     @staticmethod
     def e_default(exc: Exception) -> JSONResponse:
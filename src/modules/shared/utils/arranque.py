@@ -0,0 +1,83 @@
+# src/modules/shared/utils/arranque.py
+import asyncio
+import importlib
+import time
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+# Lo antes posible: este módulo se importa al inicio de app.py
+_INICIO = time.perf_counter()
+
+
+def _ms_desde_inicio() -> float:
+    return round((time.perf_counter() - _INICIO) * 1000, 1)
+
+
+@dataclass
+class EstadoArranque:
+    """
+    Tiempos y estado del arranque del proceso.
+
+    - aceptando_conexiones: el servidor ya responde (/, /health, /ready).
+    - modulos_listos: pandas, Playwright y el módulo de búsqueda ya están importados.
+    - scrapers_listos: los navegadores de SUNAT y REINFO ya están abiertos.
+
+    `fallido` indica que el proceso no va a quedar listo por sí solo (un módulo que no
+    se puede importar o demasiadas fallas seguidas al abrir los navegadores).
+    """
+
+    fases: Dict[str, float] = field(default_factory=dict)
+    importaciones: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    fallas_navegadores: int = 0
+    fallido: bool = False
+
+    def marcar(self, fase: str) -> None:
+        self.fases.setdefault(fase, _ms_desde_inicio())
+
+    def alcanzo(self, fase: str) -> bool:
+        return fase in self.fases
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phasesMs": self.fases,
+            # Tiempo de cada import en orden de carga; cada uno excluye lo que ya estaba cargado
+            "importsMs": self.importaciones,
+            "error": self.error,
+            "browserFailures": self.fallas_navegadores,
+            "failed": self.fallido,
+        }
+
+
+ESTADO = EstadoArranque()
+
+_cargas: Dict[str, asyncio.Task] = {}
+
+
+def _importar(nombre: str) -> ModuleType:
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nombre)
+    ESTADO.importaciones.setdefault(nombre, round((time.perf_counter() - inicio) * 1000, 1))
+    return modulo
+
+
+def _fallida(tarea: asyncio.Task) -> bool:
+    return tarea.done() and (tarea.cancelled() or tarea.exception() is not None)
+
+
+async def cargar_modulo(nombre: str) -> ModuleType:
+    """
+    Importa un módulo pesado en un hilo aparte (sin bloquear el event loop) y lo devuelve.
+    Las llamadas concurrentes para el mismo módulo esperan la misma importación.
+    """
+    tarea = _cargas.get(nombre)
+    if tarea is None or _fallida(tarea):
+        tarea = asyncio.create_task(asyncio.to_thread(_importar, nombre))
+        _cargas[nombre] = tarea
+    return await asyncio.shield(tarea)
+
+
+def modulo_cargado(nombre: str) -> bool:
+    tarea = _cargas.get(nombre)
+    return tarea is not None and tarea.done() and not _fallida(tarea)
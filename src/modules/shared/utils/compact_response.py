@@ -0,0 +1,67 @@
+# src/modules/shared/utils/compact_response.py
+import gzip
+from typing import Any, Dict
+
+import orjson
+import zstandard
+from fastapi import Request
+from fastapi.responses import Response
+
+# Por debajo de este tamaño comprimir cuesta más de lo que ahorra
+MIN_COMPRESS_BYTES = 1024
+ENCODINGS_SOPORTADOS = ("zstd", "gzip")  # en orden de preferencia
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Devuelve {encoding: q} a partir del header Accept-Encoding."""
+    encodings = {}
+    for parte in header.split(","):
+        nombre, _, params = parte.strip().partition(";")
+        if not nombre:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[nombre.strip().lower()] = q
+    return encodings
+
+
+def choose_encoding(request: Request) -> str:
+    """
+    Elige el encoding soportado con mayor q en el Accept-Encoding del cliente;
+    a igual q gana el orden de ENCODINGS_SOPORTADOS. 'identity' si no acepta ninguno.
+    """
+    aceptados = parse_accept_encoding(request.headers.get("accept-encoding", ""))
+    mejor, mejor_q = "identity", 0.0
+    for encoding in ENCODINGS_SOPORTADOS:
+        q = aceptados.get(encoding, aceptados.get("*", 0))
+        if q > mejor_q:
+            mejor, mejor_q = encoding, q
+    return mejor
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def compact_json_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """
+    Serializa con orjson y comprime con zstd/gzip según el Accept-Encoding del cliente.
+    """
+    body = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    headers = {"Vary": "Accept-Encoding"}
+
+    encoding = choose_encoding(request) if len(body) >= MIN_COMPRESS_BYTES else "identity"
+    if encoding != "identity":
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
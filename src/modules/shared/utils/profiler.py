@@ -0,0 +1,46 @@
+# src/modules/shared/utils/profiler.py
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+
+class SamplingProfiler:
+    """
+    Profiler por muestreo sin dependencias: un hilo toma la pila del hilo observado
+    cada `interval` segundos y acumula las pilas en formato "folded"
+    (compatible con flamegraph.pl y speedscope).
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.folded()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
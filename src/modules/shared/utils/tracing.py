@@ -0,0 +1,178 @@
+# src/modules/shared/utils/tracing.py
+import bisect
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+
+from modules.shared.utils.get_local_datetime import get_local_datetime
+from settings import Settings
+
+# Trazas terminadas, disponibles para consultarlas por id durante una hora
+TRACE_STORE: TTLCache = TTLCache(maxsize=200, ttl=3600)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "startMs": round((self.start - origin) * 1000, 3),
+            "durationMs": round(((self.end or time.perf_counter()) - self.start) * 1000, 3),
+            "attributes": self.attributes,
+        }
+
+
+class _NullSpan:
+    """Span sin efecto para código que corre fuera de una traza."""
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+# Límites superiores (ms) del histograma de duraciones por etapa
+LIMITES_HISTOGRAMA_MS = (1, 10, 100, 1000, 10000)
+
+
+@dataclass
+class StageStats:
+    """Contadores e histograma de duraciones de todos los spans con un mismo nombre."""
+
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LIMITES_HISTOGRAMA_MS) + 1))
+
+    def add(self, current: Span) -> None:
+        duration_ms = (current.end - current.start) * 1000
+        self.count += 1
+        if current.attributes.get("outcome") == "error":
+            self.errors += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect.bisect_left(LIMITES_HISTOGRAMA_MS, duration_ms)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        etiquetas = [f"<={limite}ms" for limite in LIMITES_HISTOGRAMA_MS] + [f">{LIMITES_HISTOGRAMA_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "totalMs": round(self.total_ms, 3),
+            "maxMs": round(self.max_ms, 3),
+            "histogram": dict(zip(etiquetas, self.buckets)),
+        }
+
+
+@dataclass
+class Trace:
+    name: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: str = field(default_factory=lambda: get_local_datetime().isoformat())
+    origin: float = field(default_factory=time.perf_counter)
+    spans: List[Span] = field(default_factory=list)
+    profile: Optional[str] = None
+    # Una carga grande abre varios spans por RUC: se guardan en detalle solo los primeros
+    # max_spans y del resto quedan los contadores por etapa, para acotar la memoria de TRACE_STORE
+    max_spans: int = field(default_factory=lambda: Settings.TRAZA_MAX_SPANS)
+    dropped_spans: int = 0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+
+    def add_span(self, current: Span) -> None:
+        self.stages.setdefault(current.name, StageStats()).add(current)
+        if len(self.spans) < self.max_spans:
+            self.spans.append(current)
+        else:
+            self.dropped_spans += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        spans = sorted(self.spans, key=lambda s: s.start)
+        return {
+            "traceId": self.trace_id,
+            "name": self.name,
+            "startedAt": self.started_at,
+            "spans": [s.to_dict(self.origin) for s in spans],
+            "truncated": self.dropped_spans > 0,
+            "droppedSpans": self.dropped_spans,
+            "stages": {nombre: stats.to_dict() for nombre, stats in self.stages.items()},
+            "hasProfile": self.profile is not None,
+        }
+
+
+def start_trace(name: str, trace_id: Optional[str] = None) -> Trace:
+    """
+    Inicia una traza para el trabajo actual; los spans abiertos en este contexto
+    (incluidas las tareas asyncio que se creen desde él) se registran en ella.
+    Con trace_id la traza usa ese id (p. ej. el job_id), si no se genera uno.
+    """
+    trace = Trace(name, trace_id) if trace_id else Trace(name)
+    _current_trace.set(trace)
+    _current_span.set(None)
+    return trace
+
+
+def finish_trace(trace: Trace, store: bool = True) -> None:
+    if store:
+        TRACE_STORE[trace.trace_id] = trace
+    if _current_trace.get() is trace:
+        _current_trace.set(None)
+
+
+def get_current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+def get_trace(trace_id: str) -> Optional[Trace]:
+    return TRACE_STORE.get(trace_id)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Mide un bloque de código como span hijo del span actual. Fuera de una traza no hace nada.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NullSpan()
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        start=time.perf_counter(),
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+        current.attributes.setdefault("outcome", "ok")
+    except BaseException as e:
+        current.attributes.setdefault("outcome", "cancelled" if type(e).__name__ == "CancelledError" else "error")
+        current.attributes.setdefault("error", str(e) or type(e).__name__)
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        trace.add_span(current)
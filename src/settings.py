@@ -22,3 +22,56 @@ class Settings:
     GOOGLE_API_KEY = getenv("GOOGLE_API_KEY")
     GOOGLE_CSE_ID = getenv("GOOGLE_CSE_ID")
     GOOGLE_CSE_ID_ALTERNATIVE = getenv("GOOGLE_CSE_ID_ALTERNATIVE")
+
+    # Revalidación incremental
+    REVALIDACION_MAX_ANTIGUEDAD_HORAS = float(getenv("REVALIDACION_MAX_ANTIGUEDAD_HORAS", "168"))
+
+    # Consultas por RUC (endpoints JSON)
+    CACHE_CONSULTAS_TTL_SEGUNDOS = int(getenv("CACHE_CONSULTAS_TTL_SEGUNDOS", "86400"))
+    CACHE_CONSULTAS_MAX = int(getenv("CACHE_CONSULTAS_MAX", "10000"))
+    CONSULTAS_CONCURRENTES = int(getenv("CONSULTAS_CONCURRENTES", "3"))
+    # Capacidad global por sitio (consultas simultáneas entre todos los trabajos)
+    CAPACIDAD_SUNAT = int(getenv("CAPACIDAD_SUNAT", str(CONSULTAS_CONCURRENTES)))
+    CAPACIDAD_REINFO = int(getenv("CAPACIDAD_REINFO", str(CONSULTAS_CONCURRENTES)))
+    CONSULTA_LOTE_MAX_RUCS = int(getenv("CONSULTA_LOTE_MAX_RUCS", "100"))
+
+    # Navegadores
+    PAGINAS_POR_SCRAPER = int(getenv("PAGINAS_POR_SCRAPER", "3"))
+    REINFO_VERIFICACION_SEGUNDOS = int(getenv("REINFO_VERIFICACION_SEGUNDOS", "60"))
+
+    # Modo de bajo consumo de memoria
+    BLOQUE_FILAS = int(getenv("BLOQUE_FILAS", "5000"))
+    # Alertas incluidas en la respuesta en ese modo; la lista completa se descarga de /jobs/{job_id}/alerts
+    ALERTAS_MAX_EN_RESPUESTA = int(getenv("ALERTAS_MAX_EN_RESPUESTA", "1000"))
+
+    # Consultas redundantes (hedging) contra SUNAT y REINFO
+    CONSULTAS_REDUNDANTES = getenv("CONSULTAS_REDUNDANTES", "false").lower() == "true"
+    REDUNDANCIA_PERCENTIL = float(getenv("REDUNDANCIA_PERCENTIL", "95"))
+    REDUNDANCIA_PRESUPUESTO = float(getenv("REDUNDANCIA_PRESUPUESTO", "0.1"))
+    REDUNDANCIA_MIN_MUESTRAS = int(getenv("REDUNDANCIA_MIN_MUESTRAS", "20"))
+    REDUNDANCIA_UMBRAL_MINIMO_SEGUNDOS = float(getenv("REDUNDANCIA_UMBRAL_MINIMO_SEGUNDOS", "2"))
+
+    # Perfilado bajo demanda (header X-Profile: 1)
+    PERFILADO_HABILITADO = getenv("PERFILADO_HABILITADO", "true").lower() == "true"
+    # Spans guardados en detalle por traza; del resto solo quedan contadores por etapa
+    TRAZA_MAX_SPANS = int(getenv("TRAZA_MAX_SPANS", "2000"))
+
+    # Precalentamiento de la caché de consultas (RUCs del RECPO y de cargas recientes)
+    PRECALENTAMIENTO_HABILITADO = getenv("PRECALENTAMIENTO_HABILITADO", "true").lower() == "true"
+    # Horario de baja demanda, hora de Lima: "inicio-fin" (puede cruzar la medianoche)
+    PRECALENTAMIENTO_HORARIO = getenv("PRECALENTAMIENTO_HORARIO", "0-6")
+    # Se refresca un resultado cuando superó esta fracción del TTL de la caché
+    PRECALENTAMIENTO_UMBRAL = float(getenv("PRECALENTAMIENTO_UMBRAL", "0.75"))
+    PRECALENTAMIENTO_PAUSA_SEGUNDOS = float(getenv("PRECALENTAMIENTO_PAUSA_SEGUNDOS", "2"))
+    PRECALENTAMIENTO_INTERVALO_SEGUNDOS = int(getenv("PRECALENTAMIENTO_INTERVALO_SEGUNDOS", "900"))
+    PRECALENTAMIENTO_MAX_RUCS = int(getenv("PRECALENTAMIENTO_MAX_RUCS", "5000"))
+    PRECALENTAMIENTO_HISTORIAL_DIAS = int(getenv("PRECALENTAMIENTO_HISTORIAL_DIAS", "30"))
+
+    # Arranque: abrir los navegadores de SUNAT y REINFO antes de declararse listo (/ready)
+    ARRANQUE_INICIAR_NAVEGADORES = getenv("ARRANQUE_INICIAR_NAVEGADORES", "true").lower() == "true"
+    # Fallas seguidas al abrir los navegadores tras las que /health responde 503 (se sigue reintentando)
+    ARRANQUE_MAX_FALLAS_NAVEGADORES = int(getenv("ARRANQUE_MAX_FALLAS_NAVEGADORES", "5"))
+    ARRANQUE_ESPERA_MAXIMA_SEGUNDOS = float(getenv("ARRANQUE_ESPERA_MAXIMA_SEGUNDOS", "60"))
+
+    # Resultados de trabajos (descarga por /jobs/{job_id}/result)
+    RESULTADOS_TTL_HORAS = float(getenv("RESULTADOS_TTL_HORAS", "24"))
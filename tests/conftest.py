@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# El código se ejecuta desde src/ (cd src && python main.py): mismas rutas de import
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
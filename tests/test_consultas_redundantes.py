@@ -0,0 +1,75 @@
+# tests/test_consultas_redundantes.py
+import asyncio
+
+from modules.search.utils.consultas_redundantes import ConsultaRedundante
+from modules.search.utils.planificador import Planificador
+
+
+def es_error(resultado) -> bool:
+    return resultado == "Error"
+
+
+def redundancia_lista() -> ConsultaRedundante:
+    # Con historial de latencias bajas y presupuesto amplio: se cubre todo lo que pase de 0,1 s
+    redundancia = ConsultaRedundante("test", percentil=95, presupuesto=1.0, minimo_muestras=1, umbral_minimo=0.1)
+    redundancia.latencias.extend([0.05] * 5)
+    redundancia.consultas = 10
+    return redundancia
+
+
+def consultas_original_y_redundante(original, redundante):
+    llamadas = []
+
+    async def consulta():
+        llamadas.append(None)
+        return await (original() if len(llamadas) == 1 else redundante())
+
+    return consulta, llamadas
+
+
+async def responder(valor, demora):
+    await asyncio.sleep(demora)
+    return valor
+
+
+def test_redundante_usa_un_cupo_propio_y_lo_devuelve():
+    async def correr():
+        planificador = Planificador("test", capacidad=2)
+        planificador.intentar_adquirir()  # cupo del intento original
+        consulta, llamadas = consultas_original_y_redundante(
+            lambda: responder("lento", 1), lambda: responder("rápido", 0.05),
+        )
+
+        resultado = await redundancia_lista().ejecutar(
+            consulta, es_error, tomar_cupo=planificador.intentar_adquirir, liberar_cupo=planificador.liberar,
+        )
+        await asyncio.sleep(0.01)
+        return resultado, len(llamadas), planificador.ocupados
+
+    assert asyncio.run(correr()) == ("rápido", 2, 1)
+
+
+def test_sin_cupo_libre_no_se_lanza_el_redundante():
+    async def correr():
+        planificador = Planificador("test", capacidad=1)
+        planificador.intentar_adquirir()
+        consulta, llamadas = consultas_original_y_redundante(
+            lambda: responder("lento", 0.3), lambda: responder("rápido", 0),
+        )
+
+        resultado = await redundancia_lista().ejecutar(
+            consulta, es_error, tomar_cupo=planificador.intentar_adquirir, liberar_cupo=planificador.liberar,
+        )
+        return resultado, len(llamadas), planificador.ocupados
+
+    assert asyncio.run(correr()) == ("lento", 1, 1)
+
+
+def test_original_con_error_no_espera_para_siempre_al_redundante():
+    async def correr():
+        consulta, _ = consultas_original_y_redundante(
+            lambda: responder("Error", 0.3), lambda: responder("colgado", 60),
+        )
+        return await asyncio.wait_for(redundancia_lista().ejecutar(consulta, es_error), timeout=2)
+
+    assert asyncio.run(correr()) == "Error"
@@ -0,0 +1,127 @@
+# tests/test_extraccion.py
+# Los extractores en la página deben dar lo mismo que el parseo anterior en Python
+# (BeautifulSoup para SUNAT, pd.read_html para REINFO) sobre páginas guardadas.
+import asyncio
+import io
+import re
+from pathlib import Path
+
+import pytest
+
+from modules.search.utils.extraccion import (
+    CODIGOS_REINFO_INVALIDOS,
+    COLUMNA_CODIGO_UNICO,
+    extraer_actividades_sunat,
+    extraer_codigos_reinfo,
+    normalizar_codigos_reinfo,
+)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def leer_fixture(nombre: str) -> str:
+    return (FIXTURES / nombre).read_text(encoding="utf-8")
+
+
+def evaluar_en_pagina(html: str, extractor):
+    """
+    Carga el HTML en Chromium y corre el extractor sobre la página.
+    """
+    async_api = pytest.importorskip("playwright.async_api")
+
+    async def correr():
+        async with async_api.async_playwright() as p:
+            try:
+                browser = await p.chromium.launch(headless=True)
+            except Exception as e:
+                pytest.skip(f"Chromium no disponible: {e}")
+            try:
+                page = await browser.new_page()
+                await page.set_content(html)
+                return await extractor(page)
+            finally:
+                await browser.close()
+
+    return asyncio.run(correr())
+
+
+# ------------------------------------------------------------------ Implementación anterior (referencia)
+
+def actividades_con_beautifulsoup(html: str):
+    bs4 = pytest.importorskip("bs4")
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    return [
+        td.text.strip()
+        for td in soup.select("td")
+        if re.search(r'(Principal|Secundaria)\s*-\s*\d{4}', td.text)
+    ]
+
+
+def codigos_con_read_html(html: str):
+    bs4 = pytest.importorskip("bs4")
+    pytest.importorskip("html5lib")
+    pd = pytest.importorskip("pandas")
+
+    tabla = str(bs4.BeautifulSoup(html, "html.parser").select_one("#stdregistro"))
+    df_tabla = pd.read_html(io.StringIO(tabla), flavor="bs4")[0]
+    if isinstance(df_tabla.columns, pd.MultiIndex):
+        df_tabla.columns = [' '.join(col).strip() for col in df_tabla.columns]
+
+    if COLUMNA_CODIGO_UNICO not in df_tabla.columns:
+        return {"columna": False, "valores": []}
+    return {"columna": True, "valores": list(df_tabla[COLUMNA_CODIGO_UNICO].dropna().astype(str).unique())}
+
+
+# ------------------------------------------------------------------ SUNAT
+
+def test_actividades_sunat_igual_que_beautifulsoup():
+    html = leer_fixture("sunat_ficha_ruc.html")
+
+    actividades = evaluar_en_pagina(html, extraer_actividades_sunat)
+
+    assert actividades == actividades_con_beautifulsoup(html)
+    assert actividades[0] == "Principal    - 0729 - EXTRACCIÓN DE OTROS MINERALES METALÍFEROS NO FERROSOS"
+
+
+# ------------------------------------------------------------------ REINFO
+
+def test_codigos_reinfo_con_encabezado_de_dos_niveles():
+    html = leer_fixture("reinfo_resultado.html")
+
+    tabla = evaluar_en_pagina(html, extraer_codigos_reinfo)
+
+    assert tabla == codigos_con_read_html(html)
+    assert tabla == {"columna": True, "valores": ["10254321", "150001234", "10099807"]}
+
+
+def test_codigos_reinfo_sin_columna_codigo_unico():
+    html = leer_fixture("reinfo_sin_columna.html")
+
+    tabla = evaluar_en_pagina(html, extraer_codigos_reinfo)
+
+    assert tabla == codigos_con_read_html(html)
+    assert tabla == {"columna": False, "valores": []}
+
+
+def test_codigos_reinfo_detecta_conjunto_invalido():
+    html = leer_fixture("reinfo_conjunto_invalido.html")
+
+    tabla = evaluar_en_pagina(html, extraer_codigos_reinfo)
+
+    assert tabla == codigos_con_read_html(html)
+    assert set(tabla["valores"]) == CODIGOS_REINFO_INVALIDOS
+
+
+def test_codigos_reinfo_sin_tabla():
+    assert evaluar_en_pagina("<html><body><p>Sin resultados</p></body></html>", extraer_codigos_reinfo) is None
+
+
+# ------------------------------------------------------------------ Normalización de códigos
+
+def test_normalizar_codigos_reinfo_quita_ceros_como_read_html():
+    assert normalizar_codigos_reinfo(["010149108", "750001619", "10149108"]) == ["10149108", "750001619"]
+
+
+def test_normalizar_codigos_reinfo_conserva_columnas_no_numericas():
+    assert normalizar_codigos_reinfo(["010149108", "EN TRÁMITE"]) == ["010149108", "EN TRÁMITE"]
+    assert normalizar_codigos_reinfo([]) == []
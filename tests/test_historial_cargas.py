@@ -0,0 +1,111 @@
+# tests/test_historial_cargas.py
+import json
+
+import pandas as pd
+import pytest
+
+from modules.search.utils import historial_cargas
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    monkeypatch.setattr(historial_cargas, "CARPETA_CARGAS", tmp_path)
+    return tmp_path
+
+
+def fila(ruc, nombre, consultado_en, codigo="010"):
+    return {
+        "ruc": ruc,
+        "nombre_del_minero": nombre,
+        "actividad_economica": "EXTRACCIÓN DE MINERALES",
+        "alerta": "Normal",
+        "Código Único": codigo,
+        "consultado_en": consultado_en.isoformat(),
+    }
+
+
+def test_historial_en_formato_anterior_se_migra(carpeta):
+    ahora = pd.Timestamp.now(tz="UTC")
+    (carpeta / "acme.json").write_text(json.dumps([fila("20100070970", "ANA", ahora)]), encoding="utf-8")
+
+    df_previa = historial_cargas.cargar_ultima_carga("acme")
+
+    assert df_previa["ruc"].tolist() == ["20100070970"]
+    assert (carpeta / "acme.jsonl").exists()
+    assert not (carpeta / "acme.json").exists()
+
+
+def test_cargar_vigentes_lee_solo_claves_del_bloque(carpeta):
+    ahora = pd.Timestamp.now(tz="UTC")
+    filas = [
+        fila("20100070970", "ANA", ahora),
+        fila("20100070971", "", ahora),
+        fila("20100070972", "LUIS", ahora - pd.Timedelta(days=30)),  # vencida
+        fila("20100070973", "EVA", ahora),  # no está en el bloque
+    ]
+    (carpeta / "acme.jsonl").write_text("\n".join(json.dumps(f) for f in filas) + "\n", encoding="utf-8")
+    bloque = pd.DataFrame({
+        "ruc": ["20100070970", "20100070971", "20100070972"],
+        "nombre_del_minero": ["ANA", None, "LUIS"],
+    })
+
+    df_previa = historial_cargas.cargar_vigentes("acme", bloque, max_antiguedad_horas=168, filas_por_lectura=1)
+
+    assert sorted(df_previa["ruc"]) == ["20100070970", "20100070971"]
+    df_reutilizado, df_pendiente = historial_cargas.separar_filas_vigentes(bloque, df_previa, 168)
+    assert len(df_reutilizado) == 2
+    assert df_pendiente["ruc"].tolist() == ["20100070972"]
+
+
+def test_carga_temporal_no_reemplaza_el_historial_hasta_confirmar(carpeta):
+    ahora = pd.Timestamp.now(tz="UTC")
+    (carpeta / "acme.jsonl").write_text(json.dumps(fila("20100070970", "ANA", ahora)) + "\n", encoding="utf-8")
+    nueva = pd.DataFrame([fila("20100070971", "LUIS", ahora)])
+
+    historial_cargas.guardar_carga("acme", nueva, job_id="a" * 32)
+    assert historial_cargas.cargar_ultima_carga("acme")["ruc"].tolist() == ["20100070970"]
+
+    historial_cargas.confirmar_carga_temporal("acme", "a" * 32)
+    assert historial_cargas.cargar_ultima_carga("acme")["ruc"].tolist() == ["20100070971"]
+
+
+def test_cargas_simultaneas_del_mismo_cliente_no_se_mezclan(carpeta):
+    ahora = pd.Timestamp.now(tz="UTC")
+    primera, segunda = "a" * 32, "b" * 32
+
+    historial_cargas.guardar_carga("acme", pd.DataFrame([fila("20100070970", "ANA", ahora)]), job_id=primera)
+    historial_cargas.guardar_carga("acme", pd.DataFrame([fila("20100070971", "LUIS", ahora)]), job_id=segunda)
+    historial_cargas.guardar_carga(
+        "acme", pd.DataFrame([fila("20100070972", "EVA", ahora)]), anexar=True, job_id=primera,
+    )
+
+    historial_cargas.confirmar_carga_temporal("acme", primera)
+    assert historial_cargas.cargar_ultima_carga("acme")["ruc"].tolist() == ["20100070970", "20100070972"]
+
+    historial_cargas.confirmar_carga_temporal("acme", segunda)
+    assert historial_cargas.cargar_ultima_carga("acme")["ruc"].tolist() == ["20100070971"]
+    assert not list(carpeta.glob("*.tmp"))
+
+
+def test_filas_con_error_no_se_reutilizan(carpeta):
+    ahora = pd.Timestamp.now(tz="UTC")
+    error_sunat = {**fila("20100070971", "LUIS", ahora), "actividad_economica": "Error"}
+    filas = [
+        fila("20100070970", "ANA", ahora),
+        error_sunat,
+        fila("20100070972", "EVA", ahora, codigo="Error de timeout"),
+    ]
+    (carpeta / "acme.jsonl").write_text("\n".join(json.dumps(f) for f in filas) + "\n", encoding="utf-8")
+    bloque = pd.DataFrame({
+        "ruc": ["20100070970", "20100070971", "20100070972"],
+        "nombre_del_minero": ["ANA", "LUIS", "EVA"],
+    })
+
+    df_previa = historial_cargas.cargar_vigentes("acme", bloque, max_antiguedad_horas=168)
+    assert df_previa["ruc"].tolist() == ["20100070970"]
+
+    df_reutilizado, df_pendiente = historial_cargas.separar_filas_vigentes(
+        bloque, historial_cargas.cargar_ultima_carga("acme"), 168,
+    )
+    assert df_reutilizado["ruc"].tolist() == ["20100070970"]
+    assert df_pendiente["ruc"].tolist() == ["20100070971", "20100070972"]
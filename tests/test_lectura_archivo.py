@@ -0,0 +1,21 @@
+# tests/test_lectura_archivo.py
+from modules.search.utils.lectura_archivo import leer_carga, leer_carga_por_bloques
+
+CSV_EXCEL_ESPANOL = "ruc;nombre_del_minero\n20100070970;MUÑOZ PEÑA\n10456789012;JOSÉ ÁVILA\n"
+
+
+def test_csv_en_utf8(tmp_path):
+    ruta = tmp_path / "carga.csv"
+    ruta.write_text(CSV_EXCEL_ESPANOL, encoding="utf-8-sig")
+
+    assert leer_carga(ruta)["nombre_del_minero"].tolist() == ["MUÑOZ PEÑA", "JOSÉ ÁVILA"]
+
+
+def test_csv_de_excel_en_cp1252(tmp_path):
+    ruta = tmp_path / "carga.csv"
+    ruta.write_bytes(CSV_EXCEL_ESPANOL.encode("cp1252"))
+
+    assert leer_carga(ruta)["nombre_del_minero"].tolist() == ["MUÑOZ PEÑA", "JOSÉ ÁVILA"]
+
+    bloques = list(leer_carga_por_bloques(ruta, filas_por_bloque=1))
+    assert [b["nombre_del_minero"].item() for b in bloques] == ["MUÑOZ PEÑA", "JOSÉ ÁVILA"]
@@ -0,0 +1,43 @@
+# tests/test_normalizacion_ruc.py
+import pandas as pd
+
+from modules.search.utils.normalizacion_ruc import (
+    normalizar_columna_ruc,
+    preparar_rucs,
+    ruc_es_valido,
+    validar_columna_ruc,
+)
+
+
+def test_rucs_validos():
+    # Personas jurídicas conocidas y una persona natural con dígito verificador correcto
+    for ruc in ["20100070970", "20131312955", "20100047218", "10467793549"]:
+        assert ruc_es_valido(ruc), ruc
+
+
+def test_rucs_invalidos():
+    invalidos = [
+        "20100070971",  # dígito verificador incorrecto
+        "30100070975",  # dígito verificador correcto pero prefijo inexistente
+        "2010007097",  # 10 dígitos
+        "201000709700",  # 12 dígitos
+        "2010007097A",
+        "",
+    ]
+    for ruc in invalidos:
+        assert not ruc_es_valido(ruc), ruc
+
+
+def test_validar_columna_con_celdas_numericas_y_vacias():
+    serie = normalizar_columna_ruc(pd.Series([20100070970.0, " 20131312955 ", None, "20100070971"], dtype=object))
+
+    assert validar_columna_ruc(serie).tolist() == [True, True, False, False]
+
+
+def test_preparar_rucs_deduplica_los_validos():
+    df = pd.DataFrame({"ruc": pd.Series(["20100070970", "20100070970", "123", "20131312955"], dtype="string")})
+
+    validos, rucs_unicos = preparar_rucs(df)
+
+    assert validos.tolist() == [True, True, False, True]
+    assert rucs_unicos == ["20100070970", "20131312955"]
@@ -0,0 +1,82 @@
+# tests/test_planificador.py
+import asyncio
+
+from modules.search.utils.planificador import PRIORIDADES, Planificador, Trabajo
+
+
+async def consultar(planificador, trabajo, etiqueta, orden, clave=None):
+    await planificador.adquirir(trabajo, clave)
+    try:
+        orden.append(etiqueta)
+        await asyncio.sleep(0.001)
+    finally:
+        planificador.liberar()
+
+
+def test_trabajos_de_igual_prioridad_se_intercalan():
+    async def correr():
+        planificador = Planificador("test", capacidad=1)
+        grande, chico = Trabajo("grande"), Trabajo("chico")
+        orden = []
+        tareas = [asyncio.create_task(consultar(planificador, grande, f"G{i}", orden)) for i in range(10)]
+        await asyncio.sleep(0)
+        tareas += [asyncio.create_task(consultar(planificador, chico, f"c{i}", orden)) for i in range(2)]
+        await asyncio.gather(*tareas)
+        return orden
+
+    orden = asyncio.run(correr())
+    # La carga chica no espera a que termine la grande
+    assert orden.index("c1") < orden.index("G5")
+
+
+def test_prioridad_alta_se_atiende_primero():
+    async def correr():
+        planificador = Planificador("test", capacidad=1)
+        orden = []
+        tareas = [asyncio.create_task(consultar(planificador, Trabajo("carga"), f"G{i}", orden)) for i in range(5)]
+        await asyncio.sleep(0)
+        tareas.append(asyncio.create_task(
+            consultar(planificador, Trabajo("ruc", PRIORIDADES["alta"]), "A", orden)
+        ))
+        await asyncio.gather(*tareas)
+        return orden
+
+    assert asyncio.run(correr())[:2] == ["G0", "A"]
+
+
+def test_unirse_a_una_consulta_en_cola_la_promueve():
+    async def correr():
+        planificador = Planificador("test", capacidad=1)
+        grande, chico = Trabajo("grande"), Trabajo("chico")
+        orden = []
+        tareas = [
+            asyncio.create_task(consultar(planificador, grande, f"G{i}", orden, clave=f"G{i}"))
+            for i in range(10)
+        ]
+        await asyncio.sleep(0)
+
+        # La carga chica comparte el último RUC de la grande, todavía en cola
+        promovida = planificador.promover("G9", chico)
+        await asyncio.gather(*tareas)
+        return promovida, orden, planificador.estado()
+
+    promovida, orden, estado = asyncio.run(correr())
+    assert promovida
+    assert orden.index("G9") < orden.index("G3")
+    assert estado == {"capacidad": 1, "ocupados": 0, "en_cola": 0}
+
+
+def test_promover_no_empeora_el_turno():
+    async def correr():
+        planificador = Planificador("test", capacidad=1)
+        alta = Trabajo("ruc", PRIORIDADES["alta"])
+        tareas = [
+            asyncio.create_task(consultar(planificador, Trabajo("carga"), "G0", [], clave="G0")),
+            asyncio.create_task(consultar(planificador, alta, "A", [], clave="A")),
+        ]
+        await asyncio.sleep(0)
+        promovida = planificador.promover("A", Trabajo("precalentamiento", PRIORIDADES["baja"]))
+        await asyncio.gather(*tareas)
+        return promovida
+
+    assert asyncio.run(correr()) is False
@@ -0,0 +1,41 @@
+# tests/test_resultados.py
+import pytest
+
+from modules.search.utils import resultados
+
+
+@pytest.fixture(autouse=True)
+def carpeta(tmp_path, monkeypatch):
+    monkeypatch.setattr(resultados, "CARPETA_RESULTADOS", tmp_path)
+    return tmp_path
+
+
+def test_job_id_en_curso_se_rechaza():
+    job_id = resultados.nuevo_job_id()
+    resultados.iniciar_trabajo(job_id)
+    try:
+        with pytest.raises(resultados.TrabajoExistenteError):
+            resultados.iniciar_trabajo(job_id)
+        # El rechazo no saca al trabajo original de la lista de trabajos en curso
+        assert resultados.trabajo_en_progreso(job_id)
+    finally:
+        resultados.terminar_trabajo(job_id)
+
+
+def test_job_id_terminado_no_se_reutiliza():
+    job_id = resultados.nuevo_job_id()
+    resultados.iniciar_trabajo(job_id)
+    resultados.terminar_trabajo(job_id)
+
+    with pytest.raises(resultados.TrabajoExistenteError):
+        resultados.iniciar_trabajo(job_id)
+
+
+def test_formatos_en_progreso_solo_los_pedidos():
+    job_id = resultados.nuevo_job_id()
+    resultados.iniciar_trabajo(job_id, ["xlsx", "parquet"])
+    try:
+        assert resultados.formatos_en_progreso(job_id) == {"xlsx", "parquet"}
+    finally:
+        resultados.terminar_trabajo(job_id)
+    assert resultados.formatos_en_progreso(job_id) == set()
@@ -0,0 +1,29 @@
+# tests/test_tracing.py
+import asyncio
+
+from modules.shared.utils.tracing import finish_trace, get_trace, span, start_trace
+
+
+def test_traza_grande_se_trunca_y_conserva_contadores_por_etapa():
+    async def correr():
+        traza = start_trace("test")
+        traza.max_spans = 5
+        for i in range(20):
+            with span("sunat.buscar", ruc=str(i)):
+                pass
+        try:
+            with span("reinfo.intento"):
+                raise ValueError("caído")
+        except ValueError:
+            pass
+        finish_trace(traza)
+        return get_trace(traza.trace_id).to_dict()
+
+    datos = asyncio.run(correr())
+
+    assert len(datos["spans"]) == 5
+    assert datos["truncated"] is True
+    assert datos["droppedSpans"] == 16
+    assert datos["stages"]["sunat.buscar"]["count"] == 20
+    assert sum(datos["stages"]["sunat.buscar"]["histogram"].values()) == 20
+    assert datos["stages"]["reinfo.intento"]["errors"] == 1
@@ -0,0 +1,22 @@
+# tests/test_validacion_personas.py
+import asyncio
+import warnings
+
+import pandas as pd
+
+from modules.search.utils.validacion_personas import RUC_INVALIDO, consultar_filas
+
+
+def test_carga_solo_con_rucs_invalidos_no_consulta_ni_advierte():
+    df = pd.DataFrame({
+        "ruc": pd.Series(["123", "20100070971"], dtype="string"),
+        "nombre_del_minero": ["ANA", "LUIS"],
+    })
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        resultado = asyncio.run(consultar_filas(df))
+
+    assert resultado["actividad_economica"].tolist() == [RUC_INVALIDO] * 2
+    assert resultado["Código Único"].tolist() == [RUC_INVALIDO] * 2
+    assert resultado["alerta"].tolist() == [f"⚠️ {RUC_INVALIDO}"] * 2